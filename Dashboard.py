@@ -4,23 +4,39 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+import glob
+import hashlib
+import json
+import logging
+import os
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from statistics import NormalDist
 import warnings
+import zipfile
+from abc import ABC, abstractmethod
 warnings.filterwarnings('ignore')
 
-# Configuration de la page
-st.set_page_config(
-    page_title="Analyse Stratégique Avancée - Sri Lanka",
-    page_icon="🦁",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+try:
+    import fcntl
+except ImportError:  # Cache partagé indisponible hors POSIX
+    fcntl = None
 
 # CSS personnalisé avancé
-st.markdown("""
+CSS_PERSONNALISE = """
 <style>
     .main-header {
         font-size: 2.8rem;
@@ -85,7 +101,1152 @@ st.markdown("""
         margin: 0.5rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+def configure_page():
+    """Configuration de la page (uniquement quand le script est lancé par Streamlit)"""
+    st.set_page_config(
+        page_title="Analyse Stratégique Avancée - Sri Lanka",
+        page_icon="🦁",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    st.markdown(CSS_PERSONNALISE, unsafe_allow_html=True)
+
+# Répertoire propre à l'utilisateur (0700) : images, instantané et disponibilité ne sont relus
+# que s'ils n'ont pu être écrits que par lui
+REPERTOIRE_PRIVE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                                "sri_lanka")
+
+# Politique de rendu des graphiques
+SEUIL_POINTS_WEBGL = 5000
+REPERTOIRE_CACHE_FIGURES = os.environ.get("SRI_LANKA_CACHE_FIGURES", os.path.join(REPERTOIRE_PRIVE, "figures"))
+
+
+def mode_rendu(nombre_points):
+    """Mode de rendu plotly express : WebGL au-delà du seuil de points, SVG sinon"""
+    return 'webgl' if nombre_points > SEUIL_POINTS_WEBGL else 'svg'
+
+
+def trace_serie(x, y, **kwargs):
+    """Trace de série : go.Scattergl au-delà du seuil de points, go.Scatter sinon"""
+    classe = go.Scattergl if len(x) > SEUIL_POINTS_WEBGL else go.Scatter
+    return classe(x=x, y=y, **kwargs)
+
+
+# Gabarit plotly_white réduit aux propriétés des graphiques cartésiens : le gabarit complet
+# (polar, ternary, scene, geo...) représente l'essentiel du JSON envoyé avec chaque figure
+GABARIT_ALLEGE = go.layout.Template(layout={
+    propriete: pio.templates['plotly_white'].layout[propriete]
+    for propriete in ('colorway', 'font', 'hovermode', 'hoverlabel', 'paper_bgcolor',
+                      'plot_bgcolor', 'xaxis', 'yaxis', 'title')
+})
+
+
+@st.cache_resource
+def gabarits_figures():
+    """Figures construites une fois par processus (mise en page, styles, légendes), indexées par structure"""
+    # Amorcées par l'instantané de préchauffage quand il existe
+    return instantane_prechauffage()['gabarits']
+
+
+def figure_depuis_gabarit(cle, construire, series):
+    """Copie du gabarit `cle` (construit au premier appel) dont seules les ordonnées des traces sont remplacées"""
+    gabarits = gabarits_figures()
+    if cle not in gabarits:
+        gabarits[cle] = construire()
+    fig = go.Figure(gabarits[cle])
+    for trace, y in zip(fig.data, series):
+        trace.y = y
+    return fig
+
+
+@st.cache_resource
+def pool_rendu():
+    """Pool de rendu d'images statiques partagé par les sessions (kaleido rend hors processus)"""
+    return {'pool': ThreadPoolExecutor(max_workers=max(2, (os.cpu_count() or 2) // 2)),
+            'en_cours': {}, 'verrou': threading.Lock()}
+
+
+def _rendre_image(figure_json, format_image, largeur, hauteur, chemin):
+    image = pio.from_json(figure_json).to_image(format=format_image, width=largeur, height=hauteur)
+    # Écriture atomique : un lecteur concurrent ne voit jamais un fichier partiel
+    ecrire_fichier_prive(chemin, lambda fichier: fichier.write(image))
+    return image
+
+
+def exporter_figure(fig, format_image='png', largeur=1200, hauteur=600):
+    """Image statique (PNG/SVG) rendue en arrière-plan et mise en cache sur disque par empreinte de contenu"""
+    figure_json = fig.to_json()
+    empreinte = hashlib.sha256(f"{format_image}:{largeur}x{hauteur}:{figure_json}".encode('utf-8')).hexdigest()
+    chemin = os.path.join(REPERTOIRE_CACHE_FIGURES, f"{empreinte}.{format_image}")
+    try:
+        with ouvrir_fichier_prive(chemin) as fichier:
+            futur = Future()
+            futur.set_result(fichier.read())
+            return futur
+    except OSError:
+        # Absente, ou modifiable par un autre utilisateur : rendue à nouveau et remplacée
+        pass
+    
+    rendu = pool_rendu()
+    with rendu['verrou']:
+        futur = rendu['en_cours'].get(empreinte)
+        if futur is None:
+            futur = rendu['pool'].submit(_rendre_image, figure_json, format_image, largeur, hauteur, chemin)
+            rendu['en_cours'][empreinte] = futur
+            futur.add_done_callback(lambda _: rendu['en_cours'].pop(empreinte, None))
+    return futur
+
+# Préchauffage : résultats coûteux calculés au démarrage du serveur et persistés pour la même version du code
+FICHIER_INSTANTANE = os.environ.get("SRI_LANKA_INSTANTANE", os.path.join(REPERTOIRE_PRIVE, "instantane.npz"))
+FICHIER_PRET = os.environ.get("SRI_LANKA_PRET", os.path.join(REPERTOIRE_PRIVE, "pret.json"))
+CAPACITE_PRECALCUL = 128
+
+
+def version_code():
+    """Empreinte du code : un déploiement ne relit jamais les résultats d'une version précédente"""
+    with open(__file__, 'rb') as fichier:
+        return hashlib.sha1(fichier.read()).hexdigest()[:12]
+
+
+def ecrire_fichier_prive(chemin, ecrire):
+    """Écriture atomique dans un répertoire privé (0700), fichier lisible et modifiable par l'utilisateur seul"""
+    repertoire = os.path.dirname(os.path.abspath(chemin))
+    if os.path.dirname(repertoire) == REPERTOIRE_PRIVE:
+        os.makedirs(REPERTOIRE_PRIVE, mode=0o700, exist_ok=True)
+    os.makedirs(repertoire, mode=0o700, exist_ok=True)
+    temporaire = f"{chemin}.{os.getpid()}.{threading.get_ident()}.tmp"
+    descripteur = os.open(temporaire, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW, 0o600)
+    try:
+        with os.fdopen(descripteur, 'wb') as fichier:
+            ecrire(fichier)
+        os.replace(temporaire, chemin)
+    except BaseException:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        raise
+    return os.path.getsize(chemin)
+
+
+def ouvrir_fichier_prive(chemin):
+    """Ouvre un fichier (et son répertoire) appartenant à l'utilisateur courant et modifiable par lui seul"""
+    descripteur = os.open(chemin, os.O_RDONLY | os.O_NOFOLLOW)
+    try:
+        for etat in (os.fstat(descripteur), os.stat(os.path.dirname(os.path.abspath(chemin)))):
+            if (hasattr(os, 'getuid') and etat.st_uid != os.getuid()) or etat.st_mode & 0o022:
+                raise PermissionError(f"{chemin} : propriétaire ou droits d'écriture non sûrs")
+        return os.fdopen(descripteur, 'rb')
+    except BaseException:
+        os.close(descripteur)
+        raise
+
+
+def _cle_json(cle):
+    """Clé de cache (tuples, chaînes, nombres) en JSON ; les tuples redeviennent des tuples à la lecture"""
+    if isinstance(cle, tuple):
+        return [_cle_json(element) for element in cle]
+    if isinstance(cle, np.generic):
+        return cle.item()
+    if cle is None or isinstance(cle, (str, int, float, bool)):
+        return cle
+    raise TypeError(f"Clé de cache non sérialisable : {cle!r}")
+
+
+def _cle_depuis_json(valeur):
+    return tuple(_cle_depuis_json(element) for element in valeur) if isinstance(valeur, list) else valeur
+
+
+def _serialiser_resultat(valeur, prefixe, tableaux):
+    """Description JSON d'un résultat précalculé ; ses tableaux numériques sont ajoutés à `tableaux`"""
+    if isinstance(valeur, tuple) and len(valeur) == 2 and isinstance(valeur[0], pd.DataFrame):
+        df, config = valeur
+        tableaux[prefixe] = df.to_numpy(dtype=float)
+        return {'type': 'donnees', 'colonnes': list(df.columns),
+                'entiers': [c for c in df.columns if pd.api.types.is_integer_dtype(df[c])], 'config': config}
+    if isinstance(valeur, dict) and all(isinstance(serie, np.ndarray) for serie in valeur.values()):
+        noms = list(valeur)
+        for k, nom in enumerate(noms):
+            tableaux[f"{prefixe}_{k}"] = valeur[nom]
+        return {'type': 'series', 'noms': noms}
+    if isinstance(valeur, go.Figure):
+        return {'type': 'figure', 'figure': valeur.to_json()}
+    raise TypeError(f"Résultat précalculé non sérialisable : {type(valeur).__name__}")
+
+
+def _deserialiser_resultat(description, prefixe, tableaux):
+    if description['type'] == 'donnees':
+        df = pd.DataFrame(tableaux[prefixe], columns=description['colonnes'])
+        for colonne in description['entiers']:
+            df[colonne] = df[colonne].astype('int64')
+        return df, description['config']
+    if description['type'] == 'figure':
+        return pio.from_json(description['figure'])
+    return {nom: tableaux[f"{prefixe}_{k}"] for k, nom in enumerate(description['noms'])}
+
+
+def lire_instantane(chemin):
+    """Instantané {'version', 'resultats', 'gabarits'} : tableaux numpy et JSON, jamais d'objets exécutables"""
+    with ouvrir_fichier_prive(chemin) as fichier, np.load(fichier, allow_pickle=False) as tableaux:
+        index = json.loads(tableaux['index'].item())
+        resultats = OrderedDict(
+            (_cle_depuis_json(entree['cle']), _deserialiser_resultat(entree, f"r{i}", tableaux))
+            for i, entree in enumerate(index['resultats']))
+    gabarits = {_cle_depuis_json(entree['cle']): pio.from_json(entree['figure']) for entree in index['gabarits']}
+    return {'version': index['version'], 'resultats': resultats, 'gabarits': gabarits}
+
+
+@st.cache_resource
+def instantane_prechauffage():
+    """Résultats précalculés du processus, initialisés depuis l'instantané persisté (même version du code)"""
+    contenu = {'resultats': OrderedDict(), 'gabarits': {}}
+    try:
+        lu = lire_instantane(FICHIER_INSTANTANE)
+        if lu['version'] == version_code():
+            contenu = lu
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile) as erreur:
+        # Les avertissements Python sont désactivés dans ce module : journalisé
+        logging.getLogger(__name__).warning("Instantané de préchauffage ignoré : %s", erreur)
+    return {'resultats': contenu['resultats'], 'gabarits': contenu['gabarits'], 'verrou': threading.Lock()}
+
+
+def precalcul(cle, calculer):
+    """Résultat pris dans l'instantané de préchauffage, sinon calculé et conservé (LRU de CAPACITE_PRECALCUL)"""
+    instantane = instantane_prechauffage()
+    resultats = instantane['resultats']
+    with instantane['verrou']:
+        if cle in resultats:
+            resultats.move_to_end(cle)
+            return resultats[cle]
+    valeur = calculer()
+    with instantane['verrou']:
+        valeur = resultats.setdefault(cle, valeur)
+        resultats.move_to_end(cle)
+        while len(resultats) > CAPACITE_PRECALCUL:
+            resultats.popitem(last=False)
+    return valeur
+
+
+def sauvegarder_instantane(chemin=FICHIER_INSTANTANE):
+    """Persiste les résultats précalculés et les gabarits de figures du processus (npz sans objets Python)"""
+    instantane = instantane_prechauffage()
+    with instantane['verrou']:
+        resultats, gabarits = list(instantane['resultats'].items()), list(instantane['gabarits'].items())
+    tableaux, index = {}, {'version': version_code(), 'resultats': [], 'gabarits': []}
+    for i, (cle, valeur) in enumerate(resultats):
+        index['resultats'].append({'cle': _cle_json(cle), **_serialiser_resultat(valeur, f"r{i}", tableaux)})
+    for cle, fig in gabarits:
+        index['gabarits'].append({'cle': _cle_json(cle), 'figure': fig.to_json()})
+    tableaux['index'] = np.array(json.dumps(index, ensure_ascii=False, allow_nan=False))
+    return ecrire_fichier_prive(chemin, lambda fichier: np.savez(fichier, **tableaux))
+
+
+def charger_sessions(chemins):
+    """Séquences d'interactions enregistrées (SRI_LANKA_ENREGISTREMENT), une liste par session"""
+    fichiers = []
+    for chemin in chemins:
+        fichiers += sorted(glob.glob(os.path.join(chemin, '*.jsonl'))) if os.path.isdir(chemin) else [chemin]
+    sessions = []
+    for fichier in fichiers:
+        with open(fichier, encoding='utf-8') as flux:
+            sessions.append([json.loads(ligne) for ligne in flux if ligne.strip()])
+    return [session for session in sessions if session]
+
+# Cache partagé entre les processus Streamlit d'un même hôte
+class StockagePartage:
+    """Jeux de données et figures sérialisées stockés une seule fois par hôte (tmpfs / fichiers projetés en mémoire)"""
+    
+    def __init__(self, repertoire, capacite_octets=512 * 2**20, references_max=64, delai_orphelins_s=600):
+        os.makedirs(repertoire, exist_ok=True)
+        self.repertoire = repertoire
+        self.capacite_octets = capacite_octets
+        self.references_max = references_max
+        self.delai_orphelins_s = delai_orphelins_s
+        self.version = version_code()
+        self._references = OrderedDict()
+        self._verrou = threading.Lock()
+    
+    def _dossier(self, cle):
+        return os.path.join(self.repertoire, hashlib.sha1(repr((self.version, cle)).encode('utf-8')).hexdigest())
+    
+    def _referencer(self, dossier):
+        """Référence de ce processus sur une entrée : verrou partagé tenu tant que l'entrée est utilisée localement"""
+        with self._verrou:
+            if dossier in self._references:
+                self._references.move_to_end(dossier)
+                return True
+            chemin = os.path.join(dossier, 'reference')
+            try:
+                descripteur = os.open(chemin, os.O_RDONLY)
+            except FileNotFoundError:
+                return False
+            fcntl.flock(descripteur, fcntl.LOCK_SH)
+            try:
+                # L'entrée a pu être évincée entre l'ouverture et le verrouillage
+                valide = os.fstat(descripteur).st_ino == os.stat(chemin).st_ino
+            except FileNotFoundError:
+                valide = False
+            if not valide:
+                os.close(descripteur)
+                return False
+            os.utime(chemin)
+            self._references[dossier] = descripteur
+            while len(self._references) > self.references_max:
+                os.close(self._references.popitem(last=False)[1])
+            return True
+    
+    def _publier(self, cle, ecrire):
+        """Publication atomique : l'entrée est écrite à part puis renommée en une seule opération"""
+        dossier = self._dossier(cle)
+        if os.path.exists(dossier):
+            return
+        temporaire = tempfile.mkdtemp(prefix='.publication-', dir=self.repertoire)
+        try:
+            ecrire(temporaire)
+            open(os.path.join(temporaire, 'reference'), 'w').close()
+            os.rename(temporaire, dossier)
+        except OSError:
+            # Publiée entre-temps par un autre processus
+            shutil.rmtree(temporaire, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(temporaire, ignore_errors=True)
+            raise
+        # Le publieur référence l'entrée avant l'éviction pour ne pas la supprimer aussitôt
+        self._referencer(dossier)
+        self.evincer()
+    
+    def publier_donnees(self, cle, df, config=None):
+        def ecrire(dossier):
+            np.save(os.path.join(dossier, 'valeurs.npy'), df.to_numpy(dtype=float))
+            meta = {'colonnes': list(df.columns),
+                    'entiers': [c for c in df.columns if pd.api.types.is_integer_dtype(df[c])],
+                    'config': config}
+            with open(os.path.join(dossier, 'meta.json'), 'w', encoding='utf-8') as fichier:
+                # Une configuration non sérialisable en JSON est une erreur, pas une valeur à convertir en texte
+                json.dump(meta, fichier, ensure_ascii=False, allow_nan=False)
+        self._publier(cle, ecrire)
+    
+    def lire_donnees(self, cle):
+        """Jeu de données projeté en mémoire (lecture seule, pages partagées entre processus) ou None"""
+        dossier = self._dossier(cle)
+        if not self._referencer(dossier):
+            return None
+        with open(os.path.join(dossier, 'meta.json'), encoding='utf-8') as fichier:
+            meta = json.load(fichier)
+        df = pd.DataFrame(np.load(os.path.join(dossier, 'valeurs.npy'), mmap_mode='r'),
+                          columns=meta['colonnes'], copy=False)
+        for colonne in meta['entiers']:
+            df[colonne] = df[colonne].astype('int64')
+        return df, meta['config']
+    
+    def publier_figure(self, cle, fig):
+        def ecrire(dossier):
+            with open(os.path.join(dossier, 'figure.json'), 'w', encoding='utf-8') as fichier:
+                fichier.write(fig.to_json())
+        self._publier(cle, ecrire)
+    
+    def lire_figure(self, cle):
+        dossier = self._dossier(cle)
+        if not self._referencer(dossier):
+            return None
+        with open(os.path.join(dossier, 'figure.json'), encoding='utf-8') as fichier:
+            return pio.from_json(fichier.read())
+    
+    def _supprimer_orphelin(self, dossier):
+        """Dossier de publication ou d'éviction laissé par un processus interrompu : supprimé passé le délai de grâce,
+        sauf s'il est encore verrouillé"""
+        try:
+            if time.time() - os.path.getmtime(dossier) < self.delai_orphelins_s:
+                return
+        except FileNotFoundError:
+            return
+        try:
+            descripteur = os.open(os.path.join(dossier, 'reference'), os.O_RDONLY)
+        except FileNotFoundError:
+            descripteur = None
+        try:
+            if descripteur is not None:
+                fcntl.flock(descripteur, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            shutil.rmtree(dossier, ignore_errors=True)
+        except BlockingIOError:
+            pass
+        finally:
+            if descripteur is not None:
+                os.close(descripteur)
+    
+    def evincer(self):
+        """Éviction des entrées les moins récemment utilisées que plus aucun processus ne référence"""
+        entrees = []
+        for nom in os.listdir(self.repertoire):
+            dossier = os.path.join(self.repertoire, nom)
+            if nom.startswith(('.publication-', '.eviction-')):
+                self._supprimer_orphelin(dossier)
+                continue
+            if nom.startswith('.') or not os.path.isdir(dossier):
+                continue
+            try:
+                taille = sum(os.path.getsize(os.path.join(dossier, f)) for f in os.listdir(dossier))
+                entrees.append((os.path.getmtime(os.path.join(dossier, 'reference')), taille, nom))
+            except FileNotFoundError:
+                continue
+        total = sum(taille for _, taille, _ in entrees)
+        for _, taille, nom in sorted(entrees):
+            if total <= self.capacite_octets:
+                break
+            dossier = os.path.join(self.repertoire, nom)
+            try:
+                descripteur = os.open(os.path.join(dossier, 'reference'), os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                # Verrou exclusif impossible tant qu'un processus (y compris celui-ci) tient une référence
+                fcntl.flock(descripteur, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                corbeille = os.path.join(self.repertoire, f".eviction-{nom}-{os.getpid()}")
+                os.rename(dossier, corbeille)
+            except (BlockingIOError, FileNotFoundError):
+                continue
+            finally:
+                os.close(descripteur)
+            shutil.rmtree(corbeille, ignore_errors=True)
+            total -= taille
+
+
+@st.cache_resource
+def stockage_partage():
+    """Stockage partagé de l'hôte, activé par SRI_LANKA_CACHE_PARTAGE (par exemple /dev/shm/sri_lanka)"""
+    repertoire = os.environ.get("SRI_LANKA_CACHE_PARTAGE")
+    if not repertoire or fcntl is None:
+        return None
+    capacite = int(os.environ.get("SRI_LANKA_CACHE_PARTAGE_MO", "512")) * 2**20
+    return StockagePartage(repertoire, capacite)
+
+# Sources de données observées
+REPERTOIRE_DONNEES = os.path.realpath(os.environ.get(
+    "SRI_LANKA_REPERTOIRE_DONNEES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "donnees")))
+
+
+class SourceDonnees(ABC):
+    """Source de séries observées (budget, effectifs, flotte...) au format de generate_advanced_data"""
+    
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self._cache = {}
+        self._verrou = threading.Lock()
+    
+    def signature(self):
+        """Signature du fichier : invalide le cache dès qu'il est modifié ou remplacé (nouvel inode)"""
+        etat = os.stat(self.chemin)
+        return (etat.st_ino, etat.st_mtime_ns, etat.st_size)
+    
+    @abstractmethod
+    def colonnes_disponibles(self):
+        """Noms des colonnes présentes dans la source"""
+    
+    @abstractmethod
+    def lire_colonnes(self, colonnes):
+        """Séries des colonnes demandées, indexées par nom"""
+    
+    def fermer(self):
+        """Libère les ressources de la source (connexions...)"""
+    
+    def charger(self, colonnes, selection=None):
+        """Charge uniquement les colonnes demandées (plus Annee), avec cache sensible aux modifications"""
+        signature = self.signature()
+        with self._verrou:
+            if self._cache.get('signature') != signature:
+                self._cache = {'signature': signature, 'colonnes': None, 'donnees': {}}
+            if self._cache['colonnes'] is None:
+                self._cache['colonnes'] = self.colonnes_disponibles()
+            disponibles = self._cache['colonnes']
+            projection = [c for c in dict.fromkeys(['Annee', 'Selection', *colonnes]) if c in disponibles]
+            manquantes = [c for c in projection if c not in self._cache['donnees']]
+        
+        if manquantes:
+            lues = self.lire_colonnes(manquantes)
+            with self._verrou:
+                if self._cache['signature'] == signature:
+                    self._cache['donnees'].update({c: lues[c] for c in manquantes})
+        else:
+            lues = {}
+        
+        with self._verrou:
+            donnees = {c: lues[c] if c in lues else self._cache['donnees'][c] for c in projection}
+        
+        df = pd.DataFrame(donnees)
+        if 'Annee' not in df.columns:
+            return pd.DataFrame(columns=['Annee'])
+        if selection is not None and 'Selection' in df.columns:
+            df = df[df['Selection'].isna() | (df['Selection'] == selection)]
+        return df.drop(columns=['Selection'], errors='ignore').sort_values('Annee').reset_index(drop=True)
+
+
+class SourceCSV(SourceDonnees):
+    def colonnes_disponibles(self):
+        return list(pd.read_csv(self.chemin, nrows=0).columns)
+    
+    def lire_colonnes(self, colonnes):
+        df = pd.read_csv(self.chemin, usecols=colonnes)
+        return {c: df[c] for c in colonnes}
+
+
+class SourceParquet(SourceDonnees):
+    def colonnes_disponibles(self):
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(self.chemin).names)
+    
+    def lire_colonnes(self, colonnes):
+        df = pd.read_parquet(self.chemin, columns=colonnes)
+        return {c: df[c] for c in colonnes}
+
+
+class SourceSQLite(SourceDonnees):
+    """Source SQLite avec un pool de connexions réutilisées entre les exécutions du script"""
+    
+    def __init__(self, chemin, table="series_observees", taille_pool=4):
+        super().__init__(chemin)
+        self.table = table
+        self.taille_pool = taille_pool
+        self._verrou_pool = threading.Lock()
+        self._signature_pool = None
+        self._pool = queue.Queue()
+    
+    def _ouvrir_pool(self, signature):
+        # Un fichier remplacé (os.replace) garde son ancien inode dans les connexions ouvertes : on les renouvelle
+        ancien, self._pool = self._pool, queue.Queue()
+        while not ancien.empty():
+            ancien.get_nowait().close()
+        for _ in range(self.taille_pool):
+            self._pool.put(sqlite3.connect(f"file:{self.chemin}?mode=ro", uri=True, check_same_thread=False))
+        self._signature_pool = signature
+    
+    def _executer(self, requete):
+        with self._verrou_pool:
+            signature = self.signature()
+            if signature != self._signature_pool:
+                self._ouvrir_pool(signature)
+            pool = self._pool
+        connexion = pool.get()
+        try:
+            return pd.read_sql_query(requete, connexion)
+        finally:
+            # Connexion d'un pool renouvelé entre-temps : fermée plutôt que rendue
+            if pool is self._pool:
+                pool.put(connexion)
+            else:
+                connexion.close()
+    
+    def fermer(self):
+        with self._verrou_pool:
+            self._signature_pool = None
+            while not self._pool.empty():
+                self._pool.get_nowait().close()
+    
+    def colonnes_disponibles(self):
+        return list(self._executer(f'PRAGMA table_info("{self.table}")')['name'])
+    
+    def lire_colonnes(self, colonnes):
+        selection = ", ".join(f'"{c}"' for c in colonnes)
+        # Colonnes lues et mises en cache séparément : même ordre de lignes garanti pour toutes
+        df = self._executer(f'SELECT {selection} FROM "{self.table}" ORDER BY rowid')
+        return {c: df[c] for c in colonnes}
+
+
+def ouvrir_source(chemin):
+    """Source d'un fichier du répertoire de données configuré (SRI_LANKA_REPERTOIRE_DONNEES), chemins relatifs acceptés"""
+    resolu = os.path.realpath(os.path.join(REPERTOIRE_DONNEES, chemin))
+    if os.path.commonpath([resolu, REPERTOIRE_DONNEES]) != REPERTOIRE_DONNEES:
+        raise ValueError(f"Fichier hors du répertoire de données autorisé : {chemin}")
+    if not os.path.isfile(resolu):
+        raise FileNotFoundError(f"Fichier introuvable : {chemin}")
+    return _ouvrir_source(resolu)
+
+
+@st.cache_resource(max_entries=8, on_release=lambda source: source.fermer())
+def _ouvrir_source(chemin):
+    """Ouvre (une seule fois par processus) la source adaptée à l'extension ; sources évincées fermées"""
+    extension = os.path.splitext(chemin)[1].lower()
+    if extension == '.csv':
+        return SourceCSV(chemin)
+    if extension in ('.parquet', '.pq'):
+        return SourceParquet(chemin)
+    if extension in ('.sqlite', '.sqlite3', '.db'):
+        return SourceSQLite(chemin)
+    raise ValueError(f"Format de source non supporté : {extension}")
+
+# Prévision des séries au-delà de l'horizon de simulation
+class ModelePrevision:
+    """Tendance linéaire par morceaux (points de rupture pénalisés) ajustée sur toutes les colonnes à la fois"""
+    
+    def __init__(self, colonnes, points_rupture=None, penalite=5.0, annee_origine=2000, ecart_relatif_min=0.01):
+        self.colonnes = list(colonnes)
+        self.points_rupture = np.asarray(points_rupture if points_rupture is not None else range(2002, 2026, 2), dtype=float)
+        self.penalite = penalite
+        self.ecart_relatif_min = ecart_relatif_min
+        self.annee_origine = annee_origine
+        p = 2 + len(self.points_rupture)
+        self.xtx = np.zeros((p, p))
+        self.xty = np.zeros((p, len(self.colonnes)))
+        self.yty = np.zeros(len(self.colonnes))
+        self.n = 0
+        self.annee_max = None
+        self.coefficients = None
+    
+    def _plan(self, annees):
+        """Matrice de plan : constante, tendance et une charnière par point de rupture"""
+        t = np.asarray(annees, dtype=float)[:, None]
+        return np.hstack([np.ones_like(t), t - self.annee_origine, np.maximum(0.0, t - self.points_rupture)])
+    
+    def mettre_a_jour(self, annees, valeurs):
+        """Intègre de nouvelles années (toutes colonnes en une opération matricielle) puis réajuste"""
+        # Seules les statistiques suffisantes (X'X, X'Y, Y'Y) sont conservées : pas de relecture de l'historique
+        x = self._plan(annees)
+        y = np.asarray(valeurs, dtype=float)
+        self.xtx += x.T @ x
+        self.xty += x.T @ y
+        self.yty += np.einsum('ij,ij->j', y, y)
+        self.n += len(x)
+        self.annee_max = max(max(annees), self.annee_max or max(annees))
+        self._resoudre()
+        return self
+    
+    def _resoudre(self):
+        # Pénalité ridge sur les seules charnières : seules les ruptures utiles sont conservées
+        regularisation = np.diag([0.0, 0.0] + [self.penalite] * len(self.points_rupture))
+        self._inverse = np.linalg.pinv(self.xtx + regularisation)
+        self.coefficients = self._inverse @ self.xty
+        residus = self.yty - 2 * np.einsum('pm,pm->m', self.coefficients, self.xty) \
+            + np.einsum('pm,pq,qm->m', self.coefficients, self.xtx, self.coefficients)
+        degres = max(self.n - np.linalg.matrix_rank(self.xtx), 1)
+        # Plancher relatif au niveau quadratique moyen : une série ajustée exactement garde une incertitude
+        plancher = self.ecart_relatif_min * np.sqrt(self.yty / max(self.n, 1))
+        self.ecart_type = np.maximum(np.sqrt(np.maximum(residus, 0.0) / degres), plancher)
+    
+    def predire(self, annees, niveau=0.9):
+        """Prévisions et intervalles de prédiction pour toutes les colonnes (DataFrames année × colonne)"""
+        x = self._plan(annees)
+        prevision = x @ self.coefficients
+        # Incertitude du modèle, élargie avec l'éloignement (ruptures futures possibles)
+        levier = np.einsum('ip,pq,iq->i', x, self._inverse, x)
+        horizon = np.maximum(np.asarray(annees, dtype=float) - self.annee_max, 0.0)
+        demi_largeur = NormalDist().inv_cdf(0.5 + niveau / 2) * np.sqrt(1 + levier + 0.1 * horizon)[:, None] * self.ecart_type
+        index = pd.Index(list(annees), name='Annee')
+        return (pd.DataFrame(prevision, index=index, columns=self.colonnes),
+                pd.DataFrame(prevision - demi_largeur, index=index, columns=self.colonnes),
+                pd.DataFrame(prevision + demi_largeur, index=index, columns=self.colonnes))
+
+
+@st.cache_resource
+def cache_previsions():
+    """Modèles de prévision ajustés, partagés par les sessions : un modèle par sélection et son empreinte de données"""
+    return {'modeles': {}, 'verrou': threading.Lock()}
+
+# Analyse des corrélations entre séries
+def _standardiser(valeurs, axe):
+    ecart = valeurs.std(axis=axe, keepdims=True)
+    return np.divide(valeurs - valeurs.mean(axis=axe, keepdims=True), ecart,
+                     out=np.zeros_like(valeurs), where=ecart > 0)
+
+
+def correlations_decalees(valeurs, decalage_max=5, fenetre=8):
+    """Corrélations, corrélations croisées décalées et corrélations glissantes de toutes les paires"""
+    # valeurs : (..., années, métriques), les dimensions de tête (ensembles, scénarios) sont traitées ensemble
+    valeurs = np.asarray(valeurs, dtype=float)
+    t = valeurs.shape[-2]
+    z = _standardiser(valeurs, -2)
+    correlation = np.einsum('...tm,...tn->...mn', z, z) / t
+    
+    # decalages[..., k, i, j] = corr(x_i(t), x_j(t + k - decalage_max)) : k > decalage_max => i précède j
+    largeur = [(0, 0)] * (z.ndim - 2) + [(decalage_max, decalage_max), (0, 0)]
+    fenetres = np.lib.stride_tricks.sliding_window_view(np.pad(z, largeur), t, axis=-2)
+    recouvrement = t - np.abs(np.arange(-decalage_max, decalage_max + 1))
+    decalages = np.einsum('...tm,...knt->...kmn', z, fenetres) / recouvrement[:, None, None]
+    
+    # Corrélations sur fenêtre glissante, standardisées localement
+    glissantes = _standardiser(np.lib.stride_tricks.sliding_window_view(valeurs, fenetre, axis=-2), -1)
+    glissantes = np.einsum('...kmw,...knw->...kmn', glissantes, glissantes) / fenetre
+    return correlation, decalages, glissantes
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def analyser_correlations(df, decalage_max=5, fenetre=8):
+    """Analyse complète des corrélations d'un jeu de données, mise en cache par contenu"""
+    colonnes = [c for c in df.columns if c != 'Annee' and not c.endswith('_Observe') and df[c].std() > 0]
+    correlation, decalages, glissantes = correlations_decalees(df[colonnes].to_numpy(), decalage_max, fenetre)
+    indice = np.abs(decalages).argmax(axis=0)
+    return {
+        'colonnes': colonnes,
+        'correlation': pd.DataFrame(correlation, index=colonnes, columns=colonnes),
+        'decalages': decalages,
+        'valeurs_decalages': list(range(-decalage_max, decalage_max + 1)),
+        'meilleur_decalage': pd.DataFrame(indice - decalage_max, index=colonnes, columns=colonnes),
+        'meilleure_correlation': pd.DataFrame(np.take_along_axis(decalages, indice[None], axis=0)[0],
+                                              index=colonnes, columns=colonnes),
+        'annees_glissantes': list(df['Annee'].iloc[fenetre - 1:]),
+        'glissantes': glissantes
+    }
+
+# Indice composite de capacité de défense
+class IndiceComposite:
+    """Agrégat pondéré et normalisé de toutes les métriques, mis à jour par différence à chaque changement de poids"""
+    
+    def __init__(self, valeurs, colonnes, poids, sens=None):
+        # valeurs : (sélections, ..., années, métriques), NaN pour une métrique absente ; poids : (sélections, métriques)
+        valeurs = np.asarray(valeurs, dtype=float)
+        self.colonnes = list(colonnes)
+        present = ~np.isnan(valeurs)
+        axes = tuple(range(valeurs.ndim - 1))
+        minimum, maximum = np.nanmin(valeurs, axis=axes), np.nanmax(valeurs, axis=axes)
+        normalisees = (valeurs - minimum) / np.where(maximum > minimum, maximum - minimum, 1.0)
+        if sens is not None:
+            # Métriques où une valeur basse est favorable (temps de mobilisation, attaques réussies)
+            normalisees = np.where(np.asarray(sens) < 0, 1.0 - normalisees, normalisees)
+        self.normalisees = np.where(present, normalisees, 0.0)
+        self.present = present.astype(float)
+        self.poids = np.array(poids, dtype=float)
+        self.recalculer()
+    
+    def recalculer(self):
+        """Agrégation complète (construction ou resynchronisation)"""
+        self.numerateur = np.einsum('s...tm,sm->s...t', self.normalisees, self.poids)
+        self.denominateur = np.einsum('s...tm,sm->s...t', self.present, self.poids)
+    
+    def ajuster_poids(self, ligne, colonne, poids):
+        """Change un poids d'une sélection : mise à jour en O(années) au lieu d'une réagrégation complète"""
+        j = self.colonnes.index(colonne)
+        delta = poids - self.poids[ligne, j]
+        if delta:
+            self.poids[ligne, j] = poids
+            self.numerateur[ligne] += delta * self.normalisees[ligne, ..., j]
+            self.denominateur[ligne] += delta * self.present[ligne, ..., j]
+    
+    def valeurs(self):
+        """Indice sur 100 pour toutes les sélections (et membres d'ensemble) et toutes les années"""
+        return 100 * self.numerateur / np.where(self.denominateur > 0, self.denominateur, np.nan)
+
+# Couches géographiques locales (aucun accès réseau) : côte, ZEE et installations en lon/lat WGS84
+FICHIER_GEO = os.environ.get("SRI_LANKA_GEO", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                           "donnees", "geo", "sri_lanka.geojson"))
+MILLE_NAUTIQUE_KM = 1.852
+KM_PAR_DEGRE = 111.32
+CENTRE_SRI_LANKA = (80.7, 7.9)
+# Niveau de zoom : (demi-largeur de la vue, tolérance de simplification, taille de tuile), en degrés
+NIVEAUX_ZOOM_CARTE = {
+    "Océan Indien": (5.0, 0.05, 4.0),
+    "Sri Lanka": (1.6, 0.01, 1.0),
+    "Côtier": (0.4, 0.0, 0.25)
+}
+
+
+@lru_cache(maxsize=None)
+def charger_couches_geo(chemin):
+    """Anneaux extérieurs des polygones par couche et table des installations (points)"""
+    with open(chemin, encoding='utf-8') as fichier:
+        collection = json.load(fichier)
+    polygones, points = {}, []
+    for entite in collection['features']:
+        geometrie, proprietes = entite['geometry'], entite['properties']
+        if geometrie['type'] == 'Point':
+            lon, lat = geometrie['coordinates'][:2]
+            points.append({**proprietes, 'lon': lon, 'lat': lat})
+            continue
+        parties = [geometrie['coordinates']] if geometrie['type'] == 'Polygon' else geometrie['coordinates']
+        for partie in parties:
+            anneau = np.asarray(partie[0], dtype=float)[:, :2]
+            polygones.setdefault(proprietes['couche'], []).append((proprietes.get('nom', ''), anneau))
+    installations = pd.DataFrame(points)
+    if 'portee_radar_nm' not in installations.columns:
+        installations['portee_radar_nm'] = np.nan
+    return polygones, installations
+
+
+def simplifier_douglas_peucker(points, tolerance):
+    """Simplification de Douglas-Peucker d'une ligne ou d'un anneau fermé (n, 2)"""
+    if tolerance <= 0 or len(points) < 4:
+        return points
+    garder = np.zeros(len(points), dtype=bool)
+    garder[[0, -1]] = True
+    pile = [(0, len(points) - 1)]
+    while pile:
+        debut, fin = pile.pop()
+        if fin - debut < 2:
+            continue
+        segment = points[fin] - points[debut]
+        relatifs = points[debut + 1:fin] - points[debut]
+        longueur = np.hypot(*segment)
+        if longueur > 0:
+            distances = np.abs(segment[0] * relatifs[:, 1] - segment[1] * relatifs[:, 0]) / longueur
+        else:
+            # Anneau fermé : première passe depuis le point de fermeture
+            distances = np.hypot(relatifs[:, 0], relatifs[:, 1])
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            milieu = debut + 1 + i
+            garder[milieu] = True
+            pile += [(debut, milieu), (milieu, fin)]
+    return points[garder]
+
+
+def decouper_rectangle(anneau, lon_min, lat_min, lon_max, lat_max):
+    """Découpage d'un anneau fermé par un rectangle (Sutherland-Hodgman, une passe vectorisée par bord)"""
+    sommets = anneau[:-1] if len(anneau) > 1 and np.array_equal(anneau[0], anneau[-1]) else anneau
+    for axe, limite, minimum in ((0, lon_min, True), (0, lon_max, False), (1, lat_min, True), (1, lat_max, False)):
+        if len(sommets) == 0:
+            return sommets
+        precedents = np.roll(sommets, 1, axis=0)
+        dedans = sommets[:, axe] >= limite if minimum else sommets[:, axe] <= limite
+        traverse = dedans != np.roll(dedans, 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (limite - precedents[:, axe]) / (sommets[:, axe] - precedents[:, axe])
+        intersections = precedents + t[:, None] * (sommets - precedents)
+        # Pour chaque arête : l'intersection si elle traverse le bord, puis le sommet s'il est à l'intérieur
+        candidats = np.stack([intersections, sommets], axis=1)
+        sommets = candidats[np.stack([traverse, dedans], axis=1)]
+    return np.vstack([sommets, sommets[:1]]) if len(sommets) else sommets
+
+
+def tuiles_vue(lon_min, lat_min, lon_max, lat_max, taille_tuile):
+    """Plage de tuiles (i0, j0, i1, j1) couvrant la vue : clé de cache alignée sur la grille"""
+    return (int(np.floor(lon_min / taille_tuile)), int(np.floor(lat_min / taille_tuile)),
+            int(np.floor(lon_max / taille_tuile)), int(np.floor(lat_max / taille_tuile)))
+
+
+@lru_cache(maxsize=64)
+def geometrie_simplifiee(chemin, couche, zoom):
+    """Anneaux d'une couche simplifiés à la tolérance du niveau de zoom"""
+    polygones, _ = charger_couches_geo(chemin)
+    tolerance = NIVEAUX_ZOOM_CARTE[zoom][1]
+    return [(nom, simplifier_douglas_peucker(anneau, tolerance)) for nom, anneau in polygones.get(couche, [])]
+
+
+@lru_cache(maxsize=256)
+def geometrie_tuilee(chemin, couche, zoom, tuiles):
+    """Anneaux simplifiés découpés à l'emprise d'une plage de tuiles ; seuls les sommets visibles sont envoyés"""
+    taille_tuile = NIVEAUX_ZOOM_CARTE[zoom][2]
+    i0, j0, i1, j1 = tuiles
+    emprise = (i0 * taille_tuile, j0 * taille_tuile, (i1 + 1) * taille_tuile, (j1 + 1) * taille_tuile)
+    anneaux = [(nom, decouper_rectangle(anneau, *emprise)) for nom, anneau in geometrie_simplifiee(chemin, couche, zoom)]
+    return [(nom, anneau) for nom, anneau in anneaux if len(anneau) >= 4]
+
+
+def empreintes_circulaires(lon, lat, rayons_km, segments=48):
+    """Cercles de rayon donné autour de chaque point, concaténés avec séparateurs NaN pour une seule trace"""
+    lon, lat, rayons_km = (np.asarray(v, dtype=float)[:, None] for v in (lon, lat, rayons_km))
+    angles = np.linspace(0, 2 * np.pi, segments + 1)
+    cercles_lat = lat + rayons_km / KM_PAR_DEGRE * np.sin(angles)
+    cercles_lon = lon + rayons_km / (KM_PAR_DEGRE * np.cos(np.radians(lat))) * np.cos(angles)
+    separateur = np.full((len(lon), 1), np.nan)
+    # Précision de ~100 m : inutile d'envoyer au navigateur des coordonnées à 17 chiffres
+    return (np.round(np.hstack([cercles_lon, separateur]).ravel(), 3),
+            np.round(np.hstack([cercles_lat, separateur]).ravel(), 3))
+
+
+def dans_polygone(lon, lat, anneau):
+    """Test pair-impair vectorisé sur tous les points (boucle sur les arêtes de l'anneau)"""
+    dedans = np.zeros(np.shape(lon), dtype=bool)
+    for (x1, y1), (x2, y2) in zip(anneau[:-1], anneau[1:]):
+        if y1 == y2:
+            continue
+        traverse = (y1 > lat) != (y2 > lat)
+        dedans ^= traverse & (lon < x1 + (lat - y1) * (x2 - x1) / (y2 - y1))
+    return dedans
+
+
+class GrilleCouverture:
+    """ZEE rastérisée (cellules maritimes) et noyaux de distance vectorisés pour la couverture des capteurs"""
+    
+    def __init__(self, chemin=FICHIER_GEO, resolution_km=10.0):
+        polygones, _ = charger_couches_geo(chemin)
+        anneaux_zee = [anneau for _, anneau in polygones['zee']]
+        points = np.vstack(anneaux_zee)
+        self.lon0, self.lat0 = points.mean(axis=0)
+        self.resolution_km = resolution_km
+        # Projection équirectangulaire locale en km ; centres de cellules sur une grille régulière
+        x_min, y_min = self.projeter(points[:, 0].min(), points[:, 1].min())
+        x_max, y_max = self.projeter(points[:, 0].max(), points[:, 1].max())
+        self.x = np.arange(x_min, x_max, resolution_km) + resolution_km / 2
+        self.y = np.arange(y_min, y_max, resolution_km) + resolution_km / 2
+        lon, lat = self.deprojeter(self.x[None, :], self.y[:, None])
+        lon, lat = np.broadcast_arrays(lon, lat)
+        maritime = np.zeros(lon.shape, dtype=bool)
+        for anneau in anneaux_zee:
+            maritime ^= dans_polygone(lon, lat, anneau)
+        for _, anneau in polygones.get('cote', []):
+            maritime &= ~dans_polygone(lon, lat, anneau)
+        self.masque = maritime
+        self.nombre_cellules = int(maritime.sum())
+    
+    def projeter(self, lon, lat):
+        return ((np.asarray(lon) - self.lon0) * KM_PAR_DEGRE * np.cos(np.radians(self.lat0)),
+                (np.asarray(lat) - self.lat0) * KM_PAR_DEGRE)
+    
+    def deprojeter(self, x, y):
+        return (self.lon0 + np.asarray(x) / (KM_PAR_DEGRE * np.cos(np.radians(self.lat0))),
+                self.lat0 + np.asarray(y) / KM_PAR_DEGRE)
+    
+    def compter(self, lon, lat, rayons_km):
+        """Nombre de capteurs couvrant chaque cellule (index spatial : seule la fenêtre englobante est évaluée)"""
+        comptes = np.zeros(self.masque.shape, dtype=np.int16)
+        x, y = self.projeter(lon, lat)
+        for xs, ys, rayon in zip(np.atleast_1d(x), np.atleast_1d(y), np.atleast_1d(rayons_km)):
+            if rayon <= 0:
+                continue
+            i0, i1 = np.searchsorted(self.x, [xs - rayon, xs + rayon])
+            j0, j1 = np.searchsorted(self.y, [ys - rayon, ys + rayon])
+            if i0 == i1 or j0 == j1:
+                continue
+            # Noyau séparable : dx² et dy² calculés une fois par fenêtre
+            dx2 = (self.x[i0:i1] - xs) ** 2
+            dy2 = (self.y[j0:j1] - ys) ** 2
+            comptes[j0:j1, i0:i1] += dy2[:, None] + dx2[None, :] <= rayon ** 2
+        return comptes
+    
+    def statistiques(self, comptes):
+        """Couverture, lacunes et chevauchement en fraction des cellules maritimes de la ZEE"""
+        comptes = comptes[self.masque]
+        return {'couverture': float(np.mean(comptes > 0)), 'lacunes': float(np.mean(comptes == 0)),
+                'chevauchement': float(np.mean(comptes > 1)), 'redondance': float(np.mean(comptes))}
+
+
+# Part de la portée de surveillance maritime couverte en patrouille, par type de navire
+FACTEURS_PATROUILLE = {"Frégate": 1.0, "Patrouilleur": 0.6, "Vedette": 0.3}
+
+
+@lru_cache(maxsize=8)
+def grille_couverture(chemin=FICHIER_GEO, resolution_km=10.0):
+    return GrilleCouverture(chemin, resolution_km)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def couverture_spatiale(lon, lat, rayons_km, chemin=FICHIER_GEO, resolution_km=10.0):
+    """Statistiques de couverture par ligne de rayons (une année), mises en cache par contenu des capteurs"""
+    grille = grille_couverture(chemin, resolution_km)
+    return [grille.statistiques(grille.compter(lon, lat, rayons)) for rayons in rayons_km]
+
+
+_grille_processus = None
+
+
+def _initialiser_grille(chemin, resolution_km):
+    global _grille_processus
+    _grille_processus = grille_couverture(chemin, resolution_km)
+
+
+def _evaluer_lot(implantations, rayons_km):
+    return [_grille_processus.statistiques(_grille_processus.compter(sites[:, 0], sites[:, 1], rayons))
+            for sites, rayons in zip(implantations, rayons_km)]
+
+
+def evaluer_implantations(implantations, rayons_km, chemin=FICHIER_GEO, resolution_km=10.0,
+                          processus=None, taille_lot=64):
+    """Statistiques de couverture de nombreuses implantations (sites lon/lat, rayons km), réparties sur plusieurs cœurs"""
+    implantations = [np.asarray(sites, dtype=float) for sites in implantations]
+    rayons_km = [np.broadcast_to(np.asarray(rayons, dtype=float), len(sites))
+                 for sites, rayons in zip(implantations, rayons_km)]
+    lots = [(implantations[i:i + taille_lot], rayons_km[i:i + taille_lot])
+            for i in range(0, len(implantations), taille_lot)]
+    if processus == 1 or len(lots) == 1:
+        _initialiser_grille(chemin, resolution_km)
+        resultats = [_evaluer_lot(*lot) for lot in lots]
+    else:
+        with ProcessPoolExecutor(max_workers=processus, initializer=_initialiser_grille,
+                                 initargs=(chemin, resolution_km)) as pool:
+            resultats = list(pool.map(_evaluer_lot, *zip(*lots)))
+    return pd.DataFrame([stats for lot in resultats for stats in lot])
+
+# Cycle de vie par type d'actif : durées en années, pannes immobilisantes par an à l'état neuf,
+# vieillissement = hausse relative du taux de panne par année d'âge
+CYCLES_VIE_TYPE = {
+    "Frégate": {"duree_vie": 35, "cycle_maintenance": 4.0, "duree_maintenance": 0.5, "refonte": 1.5,
+                "taux_panne": 0.6, "vieillissement": 0.04, "duree_reparation": 0.08},
+    "Patrouilleur": {"duree_vie": 30, "cycle_maintenance": 3.0, "duree_maintenance": 0.35, "refonte": 1.0,
+                     "taux_panne": 0.8, "vieillissement": 0.05, "duree_reparation": 0.06},
+    "Vedette": {"duree_vie": 28, "cycle_maintenance": 2.0, "duree_maintenance": 0.2, "refonte": 0.5,
+                "taux_panne": 1.0, "vieillissement": 0.06, "duree_reparation": 0.05},
+    "Transport": {"duree_vie": 40, "cycle_maintenance": 4.0, "duree_maintenance": 0.5, "refonte": 1.5,
+                  "taux_panne": 0.6, "vieillissement": 0.04, "duree_reparation": 0.08},
+    "Chasseur": {"duree_vie": 30, "cycle_maintenance": 2.0, "duree_maintenance": 0.3, "refonte": 1.0,
+                 "taux_panne": 1.5, "vieillissement": 0.06, "duree_reparation": 0.06},
+    "Entraînement/Attaque": {"duree_vie": 30, "cycle_maintenance": 2.0, "duree_maintenance": 0.25, "refonte": 0.75,
+                             "taux_panne": 1.2, "vieillissement": 0.05, "duree_reparation": 0.05},
+    "Hélicoptère de combat": {"duree_vie": 30, "cycle_maintenance": 1.5, "duree_maintenance": 0.25, "refonte": 1.0,
+                              "taux_panne": 2.0, "vieillissement": 0.07, "duree_reparation": 0.06},
+    "Surveillance": {"duree_vie": 30, "cycle_maintenance": 2.0, "duree_maintenance": 0.25, "refonte": 0.75,
+                     "taux_panne": 1.0, "vieillissement": 0.05, "duree_reparation": 0.05}
+}
+
+
+class SimulateurCycleVie:
+    """Cycle de vie à événements discrets d'un parc : mise en service, maintenance programmée,
+    refonte à mi-vie, pannes dont le taux croît avec l'âge, retrait"""
+    
+    def __init__(self, mise_en_service, parametres, groupes, debut, fin, pas_par_an=12):
+        self.mise_en_service = np.asarray(mise_en_service, dtype=float)
+        self.parametres = {cle: np.broadcast_to(np.asarray(valeur, dtype=float), self.mise_en_service.shape)
+                           for cle, valeur in parametres.items()}
+        self.groupes = np.asarray(groupes, dtype=np.int64)
+        self.nombre_groupes = int(self.groupes.max()) + 1 if len(self.groupes) else 0
+        self.debut, self.fin, self.pas_par_an = debut, fin, pas_par_an
+        self.nombre_pas = int(round((fin - debut) * pas_par_an))
+    
+    def _pas(self, temps):
+        """Premier pas dont le milieu suit `temps` : un intervalle [s, e) occupe les pas [_pas(s), _pas(e))"""
+        return np.clip(np.ceil((temps - self.debut) * self.pas_par_an - 0.5), 0, self.nombre_pas).astype(np.int64)
+    
+    def _retraits(self, generateur, executions, lot, aleatoire):
+        """Date de retrait (exécutions, actifs) : durée de vie nominale, dispersée en mode aléatoire"""
+        vie = self.parametres['duree_vie'][lot] * (generateur.lognormal(0.0, 0.1, (executions, len(lot)))
+                                                   if aleatoire else np.ones((executions, len(lot))))
+        return self.mise_en_service[lot] + vie
+    
+    def _prochaine_panne(self, generateur, age, taux, vieillissement):
+        """Âge de la prochaine panne (Poisson d'intensité taux·(1 + vieillissement·âge)), par inversion
+        de l'intensité cumulée"""
+        tirage = generateur.exponential(1.0, age.shape)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            usure = (np.sqrt((1 + vieillissement * age) ** 2 + 2 * vieillissement * tirage / taux) - 1) / vieillissement
+            return usure if np.all(vieillissement > 0) else np.where(vieillissement > 0, usure, age + tirage / taux)
+    
+    # Lignes de l'état de la file d'événements (un actif × exécution par colonne)
+    ETAT = ('indice', 'mise', 'retrait', 'temps', 'maintenance', 'refonte', 'panne', 'cycle_maintenance',
+            'duree_maintenance', 'duree_refonte', 'taux_panne', 'vieillissement', 'duree_reparation')
+    
+    def _arrets(self, generateur, lot, retrait, aleatoire):
+        """File d'événements vectorisée : à chaque tour, chaque actif encore en service traite son prochain
+        événement (maintenance, refonte ou panne) ; produit les arrêts (indices aplatis, début, fin, type)"""
+        colonne = np.arange(retrait.size) % len(lot)
+        p = {cle: valeur[lot][colonne] for cle, valeur in self.parametres.items()}
+        mise = self.mise_en_service[lot][colonne]
+        if aleatoire:
+            panne = mise + self._prochaine_panne(generateur, np.zeros(len(mise)), p['taux_panne'], p['vieillissement'])
+        else:
+            panne = np.full(len(mise), np.inf)
+        # État empilé : un seul filtrage par tour quand des actifs sont retirés
+        etat = np.stack([np.arange(retrait.size), mise, retrait.ravel(), mise, mise + p['cycle_maintenance'],
+                         mise + p['duree_vie'] / 2, panne, p['cycle_maintenance'], p['duree_maintenance'],
+                         p['refonte'], p['taux_panne'], p['vieillissement'], p['duree_reparation']])
+        
+        while etat.shape[1]:
+            (indice, mise, retrait, temps, maintenance, refonte, panne, cycle, duree_maintenance,
+             duree_refonte, taux, vieillissement, duree_reparation) = etat
+            prevue = np.minimum(maintenance, refonte)
+            evenement = np.maximum(np.minimum(prevue, panne), temps)
+            en_service = evenement < retrait
+            if not en_service.all():
+                # Actifs retirés : sortis de la file
+                etat, evenement, prevue = etat[:, en_service], evenement[en_service], prevue[en_service]
+                (indice, mise, retrait, temps, maintenance, refonte, panne, cycle, duree_maintenance,
+                 duree_refonte, taux, vieillissement, duree_reparation) = etat
+                if not etat.shape[1]:
+                    break
+            
+            type_arret = np.where(panne < prevue, 2, np.where(refonte <= maintenance, 1, 0))
+            duree = np.where(type_arret == 1, duree_refonte, duree_maintenance)
+            if aleatoire:
+                # Tirages limités aux actifs concernés
+                entretien, pannes = type_arret == 0, type_arret == 2
+                duree[entretien] *= generateur.gamma(4.0, 0.25, np.count_nonzero(entretien))
+                duree[pannes] = generateur.exponential(duree_reparation[pannes])
+            yield indice.astype(np.int64), evenement, np.minimum(evenement + duree, retrait), type_arret
+            
+            # Reprise : cycle de maintenance relancé après maintenance ou refonte, pas de panne pendant un arrêt
+            np.add(evenement, duree, out=temps)
+            np.copyto(maintenance, temps + cycle, where=type_arret < 2)
+            refonte[type_arret == 1] = np.inf
+            if aleatoire:
+                np.add(mise, self._prochaine_panne(generateur, temps - mise, taux, vieillissement), out=panne)
+    
+    def _simuler_bloc(self, graine, executions, aleatoire, actifs_par_lot=2_000_000):
+        """Variations de service et d'arrêt par pas (exécutions, groupes, pas + 1), lots d'actifs × exécutions"""
+        generateur = np.random.default_rng(graine)
+        largeur = self.nombre_pas + 1
+        taille = executions * self.nombre_groupes * largeur
+        compteurs_service, compteurs_arret = np.zeros(taille), np.zeros(taille)
+        execution = np.arange(executions)[:, None]
+        total = len(self.mise_en_service)
+        taille_lot = max(1, actifs_par_lot // executions)
+        for debut_lot in range(0, total, taille_lot):
+            lot = np.arange(debut_lot, min(debut_lot + taille_lot, total))
+            retrait = self._retraits(generateur, executions, lot, aleatoire)
+            mise = np.broadcast_to(self.mise_en_service[lot], retrait.shape)
+            base = ((execution * self.nombre_groupes + self.groupes[lot]) * largeur).ravel()
+            
+            # Calendrier par pas : +1 à l'entrée en service, -1 au retrait ; idem pour chaque arrêt
+            compteurs_service += np.bincount(np.concatenate([base + self._pas(mise).ravel(),
+                                                             base + self._pas(retrait).ravel()]),
+                                             weights=np.repeat([1.0, -1.0], retrait.size), minlength=taille)
+            for indices, debut, fin, _ in self._arrets(generateur, lot, retrait, aleatoire):
+                compteurs_arret += np.bincount(np.concatenate([base[indices] + self._pas(debut),
+                                                               base[indices] + self._pas(fin)]),
+                                               weights=np.repeat([1.0, -1.0], len(indices)), minlength=taille)
+        forme = (executions, self.nombre_groupes, largeur)
+        return compteurs_service.reshape(forme), compteurs_arret.reshape(forme)
+    
+    def simuler(self, executions=16, graine=0, aleatoire=True, processus=1, executions_par_bloc=4):
+        """Actifs en service et disponibles (exécutions, groupes, pas) ; blocs d'exécutions à graines dérivées,
+        répartis sur plusieurs processus (résultat indépendant du nombre de processus)"""
+        tailles = [min(executions_par_bloc, executions - i) for i in range(0, executions, executions_par_bloc)]
+        graines = np.random.SeedSequence(graine).spawn(len(tailles))
+        arguments = (graines, tailles, [aleatoire] * len(tailles))
+        if processus == 1 or len(tailles) == 1:
+            blocs = list(map(self._simuler_bloc, *arguments))
+        else:
+            with ProcessPoolExecutor(max_workers=processus) as pool:
+                blocs = list(pool.map(self._simuler_bloc, *arguments))
+        en_service = np.cumsum(np.concatenate([service for service, _ in blocs]), axis=-1)[..., :-1]
+        arretes = np.cumsum(np.concatenate([arret for _, arret in blocs]), axis=-1)[..., :-1]
+        return {'en_service': en_service, 'disponibles': en_service - arretes}
+    
+    def annuel(self, serie):
+        """Moyenne annuelle d'une série par pas : (..., pas) -> (..., années)"""
+        return serie.reshape(*serie.shape[:-1], -1, self.pas_par_an).mean(axis=-1)
+    
+    def etats(self, indices, temps):
+        """État nominal (sans pannes) d'actifs à une date"""
+        lot = np.asarray(indices)
+        retrait = self._retraits(None, 1, lot, aleatoire=False)
+        etats = np.full(len(lot), 'Opérationnel', dtype=object)
+        for actifs, debut, fin, type_arret in self._arrets(None, lot, retrait, aleatoire=False):
+            en_cours = (debut <= temps) & (temps < fin)
+            etats[actifs[en_cours]] = np.where(type_arret[en_cours] == 1, 'Modernisation', 'Maintenance')
+        etats[temps >= retrait[0]] = 'Retiré'
+        etats[temps < self.mise_en_service[lot]] = 'En commande'
+        return list(etats)
+
+
+def simulateur_depuis_registre(actifs, debut, fin):
+    """Simulateur d'un registre d'actifs : une coque ou cellule par unité, livrées régulièrement
+    de l'unité de tête (annee) à la dernière livraison de la classe ; un groupe par classe"""
+    mises, groupes, parametres = [], [], {cle: [] for cle in CYCLES_VIE_TYPE["Frégate"]}
+    for groupe, specs in enumerate(actifs.values()):
+        unites = specs.get('unites', 1)
+        mises.append(np.linspace(specs['annee'], specs.get('derniere_livraison', specs['annee']), unites))
+        groupes.append(np.full(unites, groupe))
+        for cle, valeur in CYCLES_VIE_TYPE[specs['type']].items():
+            parametres[cle].append(np.full(unites, specs.get(cle, valeur), dtype=float))
+    return SimulateurCycleVie(np.concatenate(mises), {cle: np.concatenate(v) for cle, v in parametres.items()},
+                              np.concatenate(groupes), debut, fin)
+
+
+def processus_cycle_vie(nombre_actifs, seuil=10_000):
+    """Processus de simulation : SRI_LANKA_PROCESSUS_CYCLE_VIE, sinon tous les cœurs au-delà de `seuil` actifs"""
+    configure = os.environ.get("SRI_LANKA_PROCESSUS_CYCLE_VIE")
+    if configure:
+        return max(1, int(configure))
+    return (os.cpu_count() or 1) if nombre_actifs >= seuil else 1
+
+
+def simuler_registre(registre, debut, fin, executions=16, graine=0):
+    """Simulation en cache d'un registre (JSON, clé hachable) : séries annuelles (exécutions, classes, années)"""
+    def simuler():
+        simulateur = simulateur_depuis_registre(json.loads(registre), debut, fin)
+        # Résultat indépendant du nombre de processus : il ne fait pas partie de la clé
+        resultats = simulateur.simuler(executions, graine,
+                                       processus=processus_cycle_vie(len(simulateur.mise_en_service)))
+        return {cle: simulateur.annuel(serie) for cle, serie in resultats.items()}
+    # Conservée entre les réexécutions du script et reprise de l'instantané de préchauffage
+    return precalcul(('cycle_vie', registre, debut, fin, executions, graine), simuler)
 
 class DefenseSriLankaDashboardAvance:
     def __init__(self):
@@ -93,7 +1254,10 @@ class DefenseSriLankaDashboardAvance:
         self.programmes_options = self.define_programmes_options()
         self.naval_assets = self.define_naval_assets()
         self.air_assets = self.define_air_assets()
-        
+        self.parametres_simulation = self.define_parametres_simulation()
+        self.mode_rapport = False
+        self.rendus_en_attente = []
+    
     def define_branches_options(self):
         return [
             "Forces Armées Sri Lankaises", "Armée de Terre", "Marine Sri Lankaise", 
@@ -109,71 +1273,277 @@ class DefenseSriLankaDashboardAvance:
     
     def define_naval_assets(self):
         return {
-            "Navire d'attaque rapide Nandimithra": {"type": "Patrouilleur", "tonnage": 250, "armement": "Canons 30mm", "annee": 2014},
-            "Frégate SLNS Sayura": {"type": "Frégate", "tonnage": 2200, "armement": "Canons 76mm", "annee": 2000},
-            "Patrouilleur Sagara": {"type": "Patrouilleur", "tonnage": 350, "armement": "Canons 23mm", "annee": 2015},
-            "Vedette rapide Weeraya": {"type": "Vedette", "tonnage": 55, "armement": "Mitrailleuses", "annee": 2018},
-            "Navire de débarquement SLNS Shakthi": {"type": "Transport", "tonnage": 4100, "armement": "Canons 40mm", "annee": 1994}
+            "Vedettes rapides classe Dvora": {"type": "Vedette", "tonnage": 47, "armement": "Canon 20mm", "annee": 1984, "base": "Trincomalee", "unites": 40, "derniere_livraison": 1999},
+            "Navire d'attaque rapide Nandimithra": {"type": "Patrouilleur", "tonnage": 250, "armement": "Canons 30mm", "annee": 2014, "base": "Port de Colombo", "unites": 8, "derniere_livraison": 2020},
+            "Frégate SLNS Sayura": {"type": "Frégate", "tonnage": 2200, "armement": "Canons 76mm", "annee": 2000, "base": "Trincomalee", "unites": 1},
+            "Patrouilleurs côtiers classe Colombo": {"type": "Vedette", "tonnage": 60, "armement": "Canon 23mm", "annee": 2005, "base": "Port de Colombo", "unites": 30, "derniere_livraison": 2012},
+            "Patrouilleur Sagara": {"type": "Patrouilleur", "tonnage": 350, "armement": "Canons 23mm", "annee": 2015, "base": "Galle", "unites": 6, "derniere_livraison": 2022},
+            "Vedette rapide Weeraya": {"type": "Vedette", "tonnage": 55, "armement": "Mitrailleuses", "annee": 2018, "base": "Kankesanturai", "unites": 70, "derniere_livraison": 2027},
+            "Navire de débarquement SLNS Shakthi": {"type": "Transport", "tonnage": 4100, "armement": "Canons 40mm", "annee": 1994, "base": "Trincomalee", "unites": 1}
         }
     
     def define_air_assets(self):
         return {
-            "F-7G Skybolt": {"type": "Chasseur", "vitesse": "Mach 2.0", "armement": "Missiles air-air", "annee": 2008},
-            "K-8 Karakorum": {"type": "Entraînement/Attaque", "vitesse": "800 km/h", "armement": "Canon 23mm", "annee": 2011},
-            "Mi-24 Hind": {"type": "Hélicoptère de combat", "vitesse": "335 km/h", "armement": "Rockets + Canon", "annee": 2000},
-            "C-130 Hercules": {"type": "Transport", "vitesse": "540 km/h", "capacite": "20 tonnes", "annee": 2000},
-            "Beechcraft B200": {"type": "Surveillance", "vitesse": "500 km/h", "rayon": "2000 km", "annee": 2010}
+            "F-7G Skybolt": {"type": "Chasseur", "vitesse": "Mach 2.0", "armement": "Missiles air-air", "annee": 2008, "base": "Base Aérienne Katunayake", "unites": 6, "derniere_livraison": 2009},
+            "K-8 Karakorum": {"type": "Entraînement/Attaque", "vitesse": "800 km/h", "armement": "Canon 23mm", "annee": 2011, "base": "Base Aérienne Katunayake", "unites": 6, "derniere_livraison": 2012},
+            "Mi-24 Hind": {"type": "Hélicoptère de combat", "vitesse": "335 km/h", "armement": "Rockets + Canon", "annee": 2000, "base": "Base Aérienne Katunayake", "unites": 12, "derniere_livraison": 2008},
+            "C-130 Hercules": {"type": "Transport", "vitesse": "540 km/h", "capacite": "20 tonnes", "annee": 2000, "base": "Base Aérienne Katunayake", "unites": 2, "derniere_livraison": 2001},
+            "Beechcraft B200": {"type": "Surveillance", "vitesse": "500 km/h", "rayon": "2000 km", "annee": 2010, "base": "Base Aérienne Katunayake", "portee_capteur_nm": 150, "unites": 2, "derniere_livraison": 2011}
+        }
+    
+    def define_profils_ponderation(self):
+        """Profils de pondération de l'indice composite (profil par défaut et spécificités par branche)"""
+        return {
+            "Défaut": {
+                "Readiness_Operative": 3.0, "Capacite_Dissuasion": 2.0, "Couverture_Radar": 1.5,
+                "Resilience_Logistique": 1.5, "Temps_Mobilisation_Jours": 1.5, "Cyber_Capabilities": 1.0,
+                "Developpement_Technologique": 1.0, "Capacite_Artillerie": 1.0, "Production_Munitions": 1.0,
+                "Patrouilles_Maritimes": 1.0, "Exercices_Militaires": 0.5, "Budget_Defense_Mds": 0.5,
+                "Personnel_Milliers": 0.5, "Navires_Patrouille": 1.0, "Portee_Surveillance_Nm": 1.0,
+                "Interceptions_Maritimes": 0.5, "Exercices_Combines": 0.5, "Heures_Vol_Combat": 1.0,
+                "Taux_Disponibilite_Avions": 1.5, "Couverture_AD": 1.5, "Attaques_Cyber_Reussies": 1.0,
+                "Reseau_Commandement_Cyber": 1.0, "Cyber_Defense_Niveau": 1.5
+            },
+            "Armée de Terre": {"Capacite_Artillerie": 3.0, "Temps_Mobilisation_Jours": 2.5, "Resilience_Logistique": 2.0},
+            "Marine Sri Lankaise": {"Patrouilles_Maritimes": 3.0, "Navires_Patrouille": 3.0,
+                                    "Portee_Surveillance_Nm": 2.0, "Couverture_Radar": 2.0},
+            "Force Aérienne Sri Lankaise": {"Couverture_AD": 3.0, "Taux_Disponibilite_Avions": 3.0,
+                                            "Heures_Vol_Combat": 2.0, "Couverture_Radar": 2.0},
+            "Garde Côtière": {"Patrouilles_Maritimes": 3.0, "Interceptions_Maritimes": 2.0},
+            "Forces Spéciales": {"Readiness_Operative": 4.0, "Temps_Mobilisation_Jours": 3.0},
+            "Surveillance Maritime": {"Couverture_Radar": 3.0, "Portee_Surveillance_Nm": 3.0},
+            "Cybersécurité": {"Cyber_Capabilities": 3.0, "Cyber_Defense_Niveau": 3.0, "Attaques_Cyber_Reussies": 2.0}
         }
     
-    def generate_advanced_data(self, selection):
+    def define_parametres_simulation(self):
+        """Paramètres ajustables des modèles de simulation (valeurs par défaut et bornes des curseurs)"""
+        return {
+            "budget_base": {"label": "Budget de base (Md$)", "defaut": 1.5, "min": 0.1, "max": 5.0, "pas": 0.1},
+            "croissance_budget": {"label": "Croissance annuelle du budget", "defaut": 0.025, "min": 0.0, "max": 0.1, "pas": 0.005},
+            "multiplicateur_conflit": {"label": "Multiplicateur conflit (2006-2009)", "defaut": 1.25, "min": 1.0, "max": 2.0, "pas": 0.05},
+            "multiplicateur_reconstruction": {"label": "Multiplicateur reconstruction (2010-2014)", "defaut": 0.9, "min": 0.5, "max": 1.2, "pas": 0.05},
+            "multiplicateur_modernisation": {"label": "Multiplicateur modernisation (2019+)", "defaut": 1.1, "min": 0.8, "max": 1.6, "pas": 0.05},
+            "personnel_base": {"label": "Effectifs de base (milliers)", "defaut": 200, "min": 10, "max": 500, "pas": 5},
+            "croissance_personnel": {"label": "Croissance annuelle des effectifs", "defaut": 0.005, "min": 0.0, "max": 0.03, "pas": 0.001},
+            "exercices_base": {"label": "Exercices de base", "defaut": 25, "min": 5, "max": 100, "pas": 1},
+            "croissance_exercices": {"label": "Exercices supplémentaires par an", "defaut": 2.0, "min": 0.0, "max": 6.0, "pas": 0.5},
+            "readiness_base": {"label": "Préparation initiale (%)", "defaut": 60.0, "min": 30.0, "max": 80.0, "pas": 1.0},
+            "croissance_readiness": {"label": "Gain annuel de préparation", "defaut": 1.2, "min": 0.0, "max": 3.0, "pas": 0.1},
+            "bonus_post_conflit": {"label": "Bonus post-conflit (2009+)", "defaut": 10.0, "min": 0.0, "max": 20.0, "pas": 1.0},
+            "bonus_professionnalisation": {"label": "Bonus professionnalisation (2015+)", "defaut": 5.0, "min": 0.0, "max": 15.0, "pas": 1.0},
+            "plafond_readiness": {"label": "Plafond de préparation (%)", "defaut": 90.0, "min": 70.0, "max": 100.0, "pas": 1.0},
+            "dissuasion_modernisation": {"label": "Dissuasion en 2015 (%)", "defaut": 70.0, "min": 50.0, "max": 90.0, "pas": 1.0},
+            "croissance_dissuasion": {"label": "Gain annuel de dissuasion", "defaut": 1.5, "min": 0.0, "max": 4.0, "pas": 0.1},
+            "plafond_dissuasion": {"label": "Plafond de dissuasion (%)", "defaut": 85.0, "min": 60.0, "max": 100.0, "pas": 1.0},
+            "croissance_tech": {"label": "Gain annuel technologique", "defaut": 2.5, "min": 0.0, "max": 5.0, "pas": 0.1},
+            "radar_base": {"label": "Couverture radar initiale (%)", "defaut": 45.0, "min": 20.0, "max": 70.0, "pas": 1.0},
+            "croissance_radar": {"label": "Gain annuel de couverture radar", "defaut": 2.8, "min": 0.0, "max": 5.0, "pas": 0.1},
+            "plafond_radar": {"label": "Plafond de couverture radar (%)", "defaut": 85.0, "min": 60.0, "max": 100.0, "pas": 1.0},
+            "cyber_base": {"label": "Capacités cyber initiales (%)", "defaut": 35.0, "min": 10.0, "max": 60.0, "pas": 1.0},
+            "croissance_cyber": {"label": "Gain annuel cyber", "defaut": 3.5, "min": 0.0, "max": 6.0, "pas": 0.1},
+            "plafond_cyber": {"label": "Plafond cyber (%)", "defaut": 82.0, "min": 60.0, "max": 100.0, "pas": 1.0},
+            "pib_base": {"label": "Part du PIB en 2000 (%)", "defaut": 2.8, "min": 1.0, "max": 6.0, "pas": 0.1},
+            "croissance_pib": {"label": "Gain annuel de part du PIB (pts)", "defaut": 0.1, "min": 0.0, "max": 0.3, "pas": 0.01},
+            "saisonnalite_exercices": {"label": "Amplitude du cycle des exercices", "defaut": 3.0, "min": 0.0, "max": 10.0, "pas": 0.5},
+            "dissuasion_conflit": {"label": "Dissuasion pendant le conflit (%)", "defaut": 40.0, "min": 20.0, "max": 70.0, "pas": 1.0},
+            "dissuasion_reconstruction": {"label": "Dissuasion en reconstruction (%)", "defaut": 55.0, "min": 30.0, "max": 80.0, "pas": 1.0},
+            "mobilisation_base": {"label": "Temps de mobilisation en 2000 (jours)", "defaut": 96.0, "min": 30.0, "max": 150.0, "pas": 1.0},
+            "reduction_mobilisation": {"label": "Réduction annuelle de mobilisation (jours)", "defaut": 1.5, "min": 0.0, "max": 5.0, "pas": 0.1},
+            "plancher_mobilisation": {"label": "Temps de mobilisation minimal (jours)", "defaut": 48.0, "min": 10.0, "max": 90.0, "pas": 1.0},
+            "patrouilles_base": {"label": "Patrouilles maritimes en 2000", "defaut": 150.0, "min": 50.0, "max": 400.0, "pas": 5.0},
+            "croissance_patrouilles": {"label": "Patrouilles supplémentaires par an", "defaut": 10.0, "min": 0.0, "max": 30.0, "pas": 1.0},
+            "plafond_patrouilles": {"label": "Plafond de patrouilles", "defaut": 800.0, "min": 300.0, "max": 1500.0, "pas": 10.0},
+            "tech_base": {"label": "Développement technologique en 2000", "defaut": 40.0, "min": 20.0, "max": 60.0, "pas": 1.0},
+            "plafond_tech": {"label": "Plafond technologique", "defaut": 80.0, "min": 60.0, "max": 100.0, "pas": 1.0},
+            "artillerie_base": {"label": "Capacité d'artillerie en 2000", "defaut": 65.0, "min": 30.0, "max": 80.0, "pas": 1.0},
+            "croissance_artillerie": {"label": "Gain annuel d'artillerie", "defaut": 1.8, "min": 0.0, "max": 4.0, "pas": 0.1},
+            "plafond_artillerie": {"label": "Plafond d'artillerie", "defaut": 88.0, "min": 60.0, "max": 100.0, "pas": 1.0},
+            "logistique_base": {"label": "Résilience logistique en 2000", "defaut": 55.0, "min": 30.0, "max": 80.0, "pas": 1.0},
+            "croissance_logistique": {"label": "Gain annuel logistique", "defaut": 2.2, "min": 0.0, "max": 5.0, "pas": 0.1},
+            "plafond_logistique": {"label": "Plafond logistique", "defaut": 87.0, "min": 60.0, "max": 100.0, "pas": 1.0},
+            "munitions_base": {"label": "Production de munitions en 2000", "defaut": 50.0, "min": 20.0, "max": 80.0, "pas": 1.0},
+            "croissance_munitions": {"label": "Gain annuel de production de munitions", "defaut": 2.5, "min": 0.0, "max": 5.0, "pas": 0.1},
+            "plafond_munitions": {"label": "Plafond de production de munitions", "defaut": 85.0, "min": 60.0, "max": 100.0, "pas": 1.0},
+            # Séries propres aux sélections dont les priorités les incluent
+            "surveillance_base": {"label": "Portée de surveillance en 2000 (nm)", "defaut": 50.0, "min": 20.0, "max": 120.0, "pas": 5.0, "priorite": "maritime"},
+            "croissance_surveillance": {"label": "Gain annuel de portée (nm)", "defaut": 4.0, "min": 0.0, "max": 10.0, "pas": 0.5, "priorite": "maritime"},
+            "plafond_surveillance": {"label": "Portée de surveillance maximale (nm)", "defaut": 200.0, "min": 100.0, "max": 400.0, "pas": 10.0, "priorite": "maritime"},
+            "interceptions_base": {"label": "Interceptions maritimes en 2000", "defaut": 20.0, "min": 0.0, "max": 60.0, "pas": 1.0, "priorite": "maritime"},
+            "croissance_interceptions": {"label": "Interceptions supplémentaires par an", "defaut": 3.0, "min": 0.0, "max": 8.0, "pas": 0.5, "priorite": "maritime"},
+            "plafond_interceptions": {"label": "Plafond d'interceptions", "defaut": 150.0, "min": 50.0, "max": 300.0, "pas": 5.0, "priorite": "maritime"},
+            "exercices_combines_base": {"label": "Exercices combinés en 2000", "defaut": 5.0, "min": 0.0, "max": 20.0, "pas": 1.0, "priorite": "maritime"},
+            "croissance_exercices_combines": {"label": "Exercices combinés supplémentaires par an", "defaut": 2.0, "min": 0.0, "max": 5.0, "pas": 0.5, "priorite": "maritime"},
+            "plafond_exercices_combines": {"label": "Plafond d'exercices combinés", "defaut": 40.0, "min": 10.0, "max": 80.0, "pas": 1.0, "priorite": "maritime"},
+            "heures_vol_base": {"label": "Heures de vol de combat en 2000", "defaut": 800.0, "min": 200.0, "max": 1500.0, "pas": 50.0, "priorite": "aerien"},
+            "croissance_heures_vol": {"label": "Heures de vol supplémentaires par an", "defaut": 50.0, "min": 0.0, "max": 120.0, "pas": 5.0, "priorite": "aerien"},
+            "plafond_heures_vol": {"label": "Plafond d'heures de vol", "defaut": 2000.0, "min": 1000.0, "max": 4000.0, "pas": 50.0, "priorite": "aerien"},
+            "defense_aerienne_base": {"label": "Défense anti-aérienne en 2000", "defaut": 40.0, "min": 10.0, "max": 70.0, "pas": 1.0, "priorite": "aerien"},
+            "croissance_defense_aerienne": {"label": "Gain annuel de défense anti-aérienne", "defaut": 2.5, "min": 0.0, "max": 5.0, "pas": 0.1, "priorite": "aerien"},
+            "plafond_defense_aerienne": {"label": "Plafond de défense anti-aérienne", "defaut": 80.0, "min": 50.0, "max": 100.0, "pas": 1.0, "priorite": "aerien"},
+            "attaques_cyber_base": {"label": "Attaques cyber réussies en 2010", "defaut": 3.0, "min": 0.0, "max": 20.0, "pas": 0.5, "priorite": "cyber"},
+            "croissance_attaques_cyber": {"label": "Attaques cyber supplémentaires par an", "defaut": 1.5, "min": 0.0, "max": 5.0, "pas": 0.1, "priorite": "cyber"},
+            "commandement_cyber_base": {"label": "Commandement cyber en 2010", "defaut": 30.0, "min": 10.0, "max": 60.0, "pas": 1.0, "priorite": "cyber"},
+            "croissance_commandement_cyber": {"label": "Gain annuel du commandement cyber", "defaut": 4.0, "min": 0.0, "max": 8.0, "pas": 0.1, "priorite": "cyber"},
+            "plafond_commandement_cyber": {"label": "Plafond du commandement cyber", "defaut": 85.0, "min": 60.0, "max": 100.0, "pas": 1.0, "priorite": "cyber"},
+            "cyber_defense_base": {"label": "Cyber défense en 2010", "defaut": 40.0, "min": 10.0, "max": 70.0, "pas": 1.0, "priorite": "cyber"},
+            "croissance_cyber_defense": {"label": "Gain annuel de cyber défense", "defaut": 3.5, "min": 0.0, "max": 7.0, "pas": 0.1, "priorite": "cyber"},
+            "plafond_cyber_defense": {"label": "Plafond de cyber défense", "defaut": 82.0, "min": 60.0, "max": 100.0, "pas": 1.0, "priorite": "cyber"}
+        }
+    
+    def _parametre(self, config, nom):
+        """Valeur d'un paramètre de simulation, surchargée par la configuration si présente"""
+        return (config or {}).get(nom, self.parametres_simulation[nom]['defaut'])
+    
+    def _tendance(self, annees, config, nom, origine=2000):
+        """Tendance linéaire `nom_base + croissance_nom × (année - origine)`, plafonnée à `plafond_nom`"""
+        annees = np.asarray(annees)
+        return np.minimum(self._parametre(config, f'{nom}_base') + self._parametre(config, f'croissance_{nom}') * (annees - origine),
+                          self._parametre(config, f'plafond_{nom}'))
+    
+    def parametres_applicables(self, config):
+        """Paramètres ayant un effet sur la sélection : communs, ou propres à l'une de ses priorités"""
+        priorites = (config or {}).get('priorites', [])
+        return [nom for nom, spec in self.parametres_simulation.items()
+                if 'priorite' not in spec or spec['priorite'] in priorites]
+    
+    def generate_advanced_data(self, selection, surcharges=None):
         """Génère des données avancées et détaillées pour le Sri Lanka"""
         annees = list(range(2000, 2028))
         
         config = self.get_advanced_config(selection)
+        if surcharges:
+            config = {**config, **surcharges}
         
         data = {
             'Annee': annees,
             'Budget_Defense_Mds': self.simulate_advanced_budget(annees, config),
             'Personnel_Milliers': self.simulate_advanced_personnel(annees, config),
-            'PIB_Militaire_Pourcent': self.simulate_military_gdp_percentage(annees),
+            'PIB_Militaire_Pourcent': self.simulate_military_gdp_percentage(annees, config),
             'Exercices_Militaires': self.simulate_advanced_exercises(annees, config),
-            'Readiness_Operative': self.simulate_advanced_readiness(annees),
-            'Capacite_Dissuasion': self.simulate_advanced_deterrence(annees),
-            'Temps_Mobilisation_Jours': self.simulate_advanced_mobilization(annees),
-            'Patrouilles_Maritimes': self.simulate_maritime_patrols(annees),
-            'Developpement_Technologique': self.simulate_tech_development(annees),
-            'Capacite_Artillerie': self.simulate_artillery_capacity(annees),
-            'Couverture_Radar': self.simulate_radar_coverage(annees),
-            'Resilience_Logistique': self.simulate_logistical_resilience(annees),
-            'Cyber_Capabilities': self.simulate_cyber_capabilities(annees),
-            'Production_Munitions': self.simulate_ammunition_production(annees)
+            'Readiness_Operative': self.simulate_advanced_readiness(annees, config),
+            'Capacite_Dissuasion': self.simulate_advanced_deterrence(annees, config),
+            'Temps_Mobilisation_Jours': self.simulate_advanced_mobilization(annees, config),
+            'Patrouilles_Maritimes': self.simulate_maritime_patrols(annees, config),
+            'Developpement_Technologique': self.simulate_tech_development(annees, config),
+            'Capacite_Artillerie': self.simulate_artillery_capacity(annees, config),
+            'Couverture_Radar': self.simulate_radar_coverage(annees, config),
+            'Resilience_Logistique': self.simulate_logistical_resilience(annees, config),
+            'Cyber_Capabilities': self.simulate_cyber_capabilities(annees, config),
+            'Production_Munitions': self.simulate_ammunition_production(annees, config)
         }
         
         # Données spécifiques aux programmes
         if 'maritime' in config.get('priorites', []):
             data.update({
                 'Navires_Patrouille': self.simulate_naval_fleet(annees),
-                'Portee_Surveillance_Nm': self.simulate_surveillance_range(annees),
-                'Interceptions_Maritimes': self.simulate_maritime_interceptions(annees),
-                'Exercices_Combines': self.simulate_joint_exercises(annees)
+                'Portee_Surveillance_Nm': self.simulate_surveillance_range(annees, config),
+                'Interceptions_Maritimes': self.simulate_maritime_interceptions(annees, config),
+                'Exercices_Combines': self.simulate_joint_exercises(annees, config)
             })
         
         if 'aerien' in config.get('priorites', []):
             data.update({
-                'Heures_Vol_Combat': self.simulate_flight_hours(annees),
+                'Heures_Vol_Combat': self.simulate_flight_hours(annees, config),
                 'Taux_Disponibilite_Avions': self.simulate_aircraft_availability(annees),
-                'Couverture_AD': self.simulate_air_defense(annees)
+                'Couverture_AD': self.simulate_air_defense(annees, config)
             })
         
         if 'cyber' in config.get('priorites', []):
             data.update({
-                'Attaques_Cyber_Reussies': self.simulate_cyber_attacks(annees),
-                'Reseau_Commandement_Cyber': self.simulate_cyber_command(annees),
-                'Cyber_Defense_Niveau': self.simulate_cyber_defense(annees)
+                'Attaques_Cyber_Reussies': self.simulate_cyber_attacks(annees, config),
+                'Reseau_Commandement_Cyber': self.simulate_cyber_command(annees, config),
+                'Cyber_Defense_Niveau': self.simulate_cyber_defense(annees, config)
             })
         
         return pd.DataFrame(data), config
     
+    def shared_data(self, selection):
+        """Données de la sélection, lues dans le cache partagé de l'hôte quand il est activé"""
+        stockage = stockage_partage()
+        if stockage is None:
+            df, config = precalcul(('donnees', selection), lambda: self.generate_advanced_data(selection))
+            return df.copy(), dict(config)
+        lues = stockage.lire_donnees(('donnees', selection))
+        if lues is not None:
+            return lues
+        df, config = self.generate_advanced_data(selection)
+        stockage.publier_donnees(('donnees', selection), df, config)
+        return df, config
+    
+    def data_signature(self, df, colonnes=None):
+        """Empreinte du contenu des colonnes (clé des figures partagées dépendant des données)"""
+        donnees = df if colonnes is None else df[['Annee', *colonnes]]
+        return int(pd.util.hash_pandas_object(donnees, index=False).sum())
+    
+    def shared_figure(self, cle, construire):
+        """Figure construite une seule fois par hôte quand le cache partagé est activé, sinon par processus
+        (et reprise de l'instantané de préchauffage)"""
+        stockage = stockage_partage()
+        if stockage is None:
+            # Copie : la figure conservée n'est jamais modifiée par l'affichage
+            return go.Figure(precalcul(('figure', cle), construire))
+        fig = stockage.lire_figure(('figure', cle))
+        if fig is None:
+            fig = construire()
+            stockage.publier_figure(('figure', cle), fig)
+        return fig
+    
+    def forecast_bounds(self, config=None):
+        """Bornes (min, max) des séries imposées par les simulations : plafonds configurés, sinon [0, 100] ou positivité"""
+        plafonds = {
+            'Readiness_Operative': 'plafond_readiness', 'Capacite_Dissuasion': 'plafond_dissuasion',
+            'Developpement_Technologique': 'plafond_tech', 'Capacite_Artillerie': 'plafond_artillerie',
+            'Couverture_Radar': 'plafond_radar', 'Resilience_Logistique': 'plafond_logistique',
+            'Cyber_Capabilities': 'plafond_cyber', 'Production_Munitions': 'plafond_munitions',
+            'Patrouilles_Maritimes': 'plafond_patrouilles', 'Portee_Surveillance_Nm': 'plafond_surveillance',
+            'Interceptions_Maritimes': 'plafond_interceptions', 'Exercices_Combines': 'plafond_exercices_combines',
+            'Heures_Vol_Combat': 'plafond_heures_vol', 'Couverture_AD': 'plafond_defense_aerienne',
+            'Reseau_Commandement_Cyber': 'plafond_commandement_cyber', 'Cyber_Defense_Niveau': 'plafond_cyber_defense'
+        }
+        bornes = {colonne: (0.0, float(self._parametre(config, nom))) for colonne, nom in plafonds.items()}
+        bornes.update({'PIB_Militaire_Pourcent': (0.0, 100.0), 'Taux_Disponibilite_Avions': (0.0, 100.0),
+                       'Temps_Mobilisation_Jours': (float(self._parametre(config, 'plancher_mobilisation')), np.inf)})
+        return bornes
+    
+    def forecast_data(self, df, selection, config=None, annees_futures=range(2028, 2036), niveau=0.9):
+        """Projette toutes les séries au-delà de l'horizon simulé, dans les bornes des simulations"""
+        colonnes = [c for c in df.columns if c != 'Annee' and not c.endswith('_Observe')]
+        donnees = df[['Annee', *colonnes]].sort_values('Annee')
+        cache = cache_previsions()
+        with cache['verrou']:
+            # Modèle réutilisé si les années qu'il couvre sont inchangées, mis à jour s'il en manque seulement
+            modele, empreinte = cache['modeles'].get(selection, (None, None))
+            if modele is not None and modele.colonnes == colonnes and donnees['Annee'].max() >= modele.annee_max:
+                anciennes = donnees[donnees['Annee'] <= modele.annee_max]
+                if pd.util.hash_pandas_object(anciennes, index=False).sum() != empreinte:
+                    modele = None
+            else:
+                modele = None
+            if modele is None:
+                modele = ModelePrevision(colonnes).mettre_a_jour(donnees['Annee'], donnees[colonnes])
+            elif donnees['Annee'].max() > modele.annee_max:
+                nouvelles = donnees[donnees['Annee'] > modele.annee_max]
+                modele.mettre_a_jour(nouvelles['Annee'], nouvelles[colonnes])
+            cache['modeles'][selection] = (modele, pd.util.hash_pandas_object(donnees, index=False).sum())
+            prevision, basse, haute = modele.predire(list(annees_futures), niveau)
+        
+        bornes = self.forecast_bounds(config)
+        minimum = pd.Series({c: bornes.get(c, (0.0, np.inf))[0] for c in colonnes})
+        maximum = pd.Series({c: bornes.get(c, (0.0, np.inf))[1] for c in colonnes})
+        return tuple(cadre.clip(lower=minimum, upper=maximum, axis=1) for cadre in (prevision, basse, haute))
+    
+    def load_observed_data(self, chemin, selection, colonnes):
+        """Charge les séries observées d'une source locale (CSV, Parquet, SQLite) pour les colonnes demandées"""
+        return ouvrir_source(chemin).charger(colonnes, selection)
+    
+    def overlay_observed_data(self, df, observe):
+        """Superpose les séries observées aux simulations (colonnes suffixées _Observe)"""
+        colonnes = [c for c in observe.columns if c != 'Annee' and c in df.columns]
+        if not colonnes:
+            return df
+        observe = observe[['Annee', *colonnes]].groupby('Annee', as_index=False).mean()
+        return df.merge(observe.rename(columns={c: f"{c}_Observe" for c in colonnes}), on='Annee', how='left')
+    
     def get_advanced_config(self, selection):
         """Configuration avancée avec plus de détails pour le Sri Lanka"""
         configs = {
@@ -220,146 +1590,284 @@ class DefenseSriLankaDashboardAvance:
     
     def simulate_advanced_budget(self, annees, config):
         """Simulation avancée du budget avec variations géopolitiques"""
-        budget_base = config.get('budget_base', 1.5)
-        budgets = []
-        for annee in annees:
-            base = budget_base * (1 + 0.025 * (annee - 2000))
-            # Variations selon événements
-            if 2006 <= annee <= 2009:  # Période de conflit
-                base *= 1.25
-            elif 2010 <= annee <= 2014:  # Reconstruction post-conflit
-                base *= 0.9
-            elif annee >= 2019:  # Modernisation
-                base *= 1.1
-            budgets.append(base)
-        return budgets
+        annees = np.asarray(annees)
+        base = self._parametre(config, 'budget_base') * (1 + self._parametre(config, 'croissance_budget') * (annees - 2000))
+        # Variations selon événements
+        multiplicateur = np.where((annees >= 2006) & (annees <= 2009),  # Période de conflit
+                                  self._parametre(config, 'multiplicateur_conflit'),
+                         np.where((annees >= 2010) & (annees <= 2014),  # Reconstruction post-conflit
+                                  self._parametre(config, 'multiplicateur_reconstruction'),
+                         np.where(annees >= 2019,  # Modernisation
+                                  self._parametre(config, 'multiplicateur_modernisation'), 1.0)))
+        return base * multiplicateur
     
     def simulate_advanced_personnel(self, annees, config):
         """Simulation avancée des effectifs"""
-        personnel_base = config.get('personnel_base', 200)
-        return [personnel_base * (1 + 0.005 * (annee - 2000)) for annee in annees]
+        annees = np.asarray(annees)
+        return self._parametre(config, 'personnel_base') * (1 + self._parametre(config, 'croissance_personnel') * (annees - 2000))
     
-    def simulate_military_gdp_percentage(self, annees):
+    def simulate_military_gdp_percentage(self, annees, config=None):
         """Pourcentage du PIB consacré à la défense"""
-        return [2.8 + 0.1 * (annee - 2000) for annee in annees]
+        annees = np.asarray(annees)
+        return self._parametre(config, 'pib_base') + self._parametre(config, 'croissance_pib') * (annees - 2000)
     
     def simulate_advanced_exercises(self, annees, config):
         """Exercices militaires avec saisonnalité"""
-        base = config.get('exercices_base', 25)
-        return [base + 2 * (annee - 2000) + 3 * np.sin(2 * np.pi * (annee - 2000)/4) for annee in annees]
+        annees = np.asarray(annees)
+        base = self._parametre(config, 'exercices_base')
+        return (base + self._parametre(config, 'croissance_exercices') * (annees - 2000)
+                + self._parametre(config, 'saisonnalite_exercices') * np.sin(2 * np.pi * (annees - 2000)/4))
     
-    def simulate_advanced_readiness(self, annees):
+    def simulate_advanced_readiness(self, annees, config=None):
         """Préparation opérationnelle avancée"""
-        readiness = []
-        for annee in annees:
-            base = 60 + 1.2 * (annee - 2000)
-            if annee >= 2009:  # Post-conflit
-                base += 10
-            if annee >= 2015:  # Professionnalisation
-                base += 5
-            readiness.append(min(base, 90))
-        return readiness
-    
-    def simulate_advanced_deterrence(self, annees):
+        annees = np.asarray(annees)
+        base = self._parametre(config, 'readiness_base') + self._parametre(config, 'croissance_readiness') * (annees - 2000)
+        base = base + self._parametre(config, 'bonus_post_conflit') * (annees >= 2009)  # Post-conflit
+        base = base + self._parametre(config, 'bonus_professionnalisation') * (annees >= 2015)  # Professionnalisation
+        return np.minimum(base, self._parametre(config, 'plafond_readiness'))
+    
+    def simulate_advanced_deterrence(self, annees, config=None):
         """Capacité de dissuasion avancée"""
-        deterrence = []
-        for annee in annees:
-            if annee < 2009:
-                base = 40  # Conflit interne
-            elif annee < 2015:
-                base = 55  # Reconstruction
-            else:
-                base = 70 + 1.5 * (annee - 2015)  # Modernisation
-            deterrence.append(min(base, 85))
-        return deterrence
+        annees = np.asarray(annees)
+        modernisation = (self._parametre(config, 'dissuasion_modernisation') +
+                         self._parametre(config, 'croissance_dissuasion') * (annees - 2015))
+        deterrence = np.where(annees < 2009, self._parametre(config, 'dissuasion_conflit'),  # Conflit interne
+                     np.where(annees < 2015, self._parametre(config, 'dissuasion_reconstruction'),  # Reconstruction
+                              modernisation))  # Modernisation
+        return np.minimum(deterrence, self._parametre(config, 'plafond_dissuasion'))
     
-    def simulate_advanced_mobilization(self, annees):
+    def simulate_advanced_mobilization(self, annees, config=None):
         """Temps de mobilisation avancé"""
-        return [max(96 - 1.5 * (annee - 2000), 48) for annee in annees]
-    
-    def simulate_maritime_patrols(self, annees):
-        """Patrouilles maritimes"""
-        patrols = []
-        for annee in annees:
-            if annee < 2009:
-                patrols.append(150 + 10 * (annee - 2000))
-            elif annee < 2015:
-                patrols.append(300 + 15 * (annee - 2009))
-            else:
-                patrols.append(450 + 20 * (annee - 2015))
-        return [min(p, 800) for p in patrols]
+        annees = np.asarray(annees)
+        return np.maximum(self._parametre(config, 'mobilisation_base') - self._parametre(config, 'reduction_mobilisation') * (annees - 2000),
+                          self._parametre(config, 'plancher_mobilisation'))
+    
+    def simulate_maritime_patrols(self, annees, config=None):
+        """Patrouilles maritimes : niveau et rythme croissants par période (conflit, reconstruction, modernisation)"""
+        annees = np.asarray(annees)
+        base, croissance = self._parametre(config, 'patrouilles_base'), self._parametre(config, 'croissance_patrouilles')
+        patrols = np.where(annees < 2009, base + croissance * (annees - 2000),
+                  np.where(annees < 2015, 2 * base + 1.5 * croissance * (annees - 2009),
+                           3 * base + 2 * croissance * (annees - 2015)))
+        return np.minimum(patrols, self._parametre(config, 'plafond_patrouilles'))
     
-    def simulate_tech_development(self, annees):
+    def simulate_tech_development(self, annees, config=None):
         """Développement technologique global"""
-        return [min(40 + 2.5 * (annee - 2000), 80) for annee in annees]
+        return self._tendance(annees, config, 'tech')
     
-    def simulate_artillery_capacity(self, annees):
+    def simulate_artillery_capacity(self, annees, config=None):
         """Capacité d'artillerie"""
-        return [min(65 + 1.8 * (annee - 2000), 88) for annee in annees]
+        return self._tendance(annees, config, 'artillerie')
     
-    def simulate_radar_coverage(self, annees):
+    def simulate_radar_coverage(self, annees, config=None):
         """Couverture radar"""
-        return [min(45 + 2.8 * (annee - 2000), 85) for annee in annees]
+        return self._tendance(annees, config, 'radar')
     
-    def simulate_logistical_resilience(self, annees):
+    def simulate_logistical_resilience(self, annees, config=None):
         """Résilience logistique"""
-        return [min(55 + 2.2 * (annee - 2000), 87) for annee in annees]
+        return self._tendance(annees, config, 'logistique')
     
-    def simulate_cyber_capabilities(self, annees):
+    def simulate_cyber_capabilities(self, annees, config=None):
         """Capacités cybernétiques"""
-        return [min(35 + 3.5 * (annee - 2000), 82) for annee in annees]
+        return self._tendance(annees, config, 'cyber')
     
-    def simulate_ammunition_production(self, annees):
+    def simulate_ammunition_production(self, annees, config=None):
         """Production de munitions (indice)"""
-        return [min(50 + 2.5 * (annee - 2000), 85) for annee in annees]
+        return self._tendance(annees, config, 'munitions')
+    
+    def simulate_fleet_lifecycle(self, actifs, annees, executions=32):
+        """Cycle de vie simulé d'un registre : en service et disponibles (exécutions, classes, années)"""
+        annees = np.asarray(annees)
+        debut = int(min(annees.min(), *(specs['annee'] for specs in actifs.values())))
+        resultats = simuler_registre(json.dumps(actifs, ensure_ascii=False), debut, int(annees.max()) + 1, executions)
+        return {cle: serie[..., annees - debut] for cle, serie in resultats.items()}
+    
+    def fleet_status(self, actifs, date):
+        """État nominal de l'unité de tête de chaque classe du registre à une date"""
+        simulateur = simulateur_depuis_registre(actifs, min(specs['annee'] for specs in actifs.values()), int(date) + 1)
+        unites = [specs.get('unites', 1) for specs in actifs.values()]
+        return simulateur.etats(np.cumsum([0, *unites[:-1]]), date)
     
     def simulate_naval_fleet(self, annees):
-        """Évolution de la flotte navale"""
-        fleet = []
-        for annee in annees:
-            if annee < 2005:
-                fleet.append(40 + (annee - 2000))
-            elif annee < 2010:
-                fleet.append(50 + 2 * (annee - 2005))
-            else:
-                fleet.append(65 + 3 * (annee - 2010))
-        return [min(f, 120) for f in fleet]
+        """Évolution de la flotte navale : coques de patrouille en service (simulation du cycle de vie)"""
+        cycle_vie = self.simulate_fleet_lifecycle(self.naval_assets, annees)
+        patrouille = [specs['type'] in FACTEURS_PATROUILLE for specs in self.naval_assets.values()]
+        return np.rint(cycle_vie['en_service'][:, patrouille].sum(axis=1).mean(axis=0)).astype(int)
     
-    def simulate_surveillance_range(self, annees):
+    def simulate_surveillance_range(self, annees, config=None):
         """Portée de surveillance maritime"""
-        return [min(50 + 4 * (annee - 2000), 200) for annee in annees]
+        return self._tendance(annees, config, 'surveillance')
     
-    def simulate_maritime_interceptions(self, annees):
+    def simulate_spatial_coverage(self, df, resolution_km=10.0):
+        """Couverture spatiale de la ZEE par année : radars côtiers, patrouilles navales et surveillance aérienne,
+        un capteur par navire ou avion disponible dans la simulation du cycle de vie"""
+        grille = grille_couverture(FICHIER_GEO, resolution_km)
+        _, installations = charger_couches_geo(FICHIER_GEO)
+        positions = installations.set_index('nom')
+        annees = df['Annee'].to_numpy()
+        if 'Portee_Surveillance_Nm' in df.columns:
+            portee = df['Portee_Surveillance_Nm'].to_numpy(dtype=float)
+        else:
+            portee = np.asarray(self.simulate_surveillance_range(annees), dtype=float)
+        
+        # Classes porteuses de capteurs et unités disponibles (classes, années), retraits et arrêts inclus
+        radars = installations.dropna(subset=['portee_radar_nm'])
+        navires = [i for i, specs in enumerate(self.naval_assets.values()) if specs['type'] in FACTEURS_PATROUILLE]
+        avions = [i for i, specs in enumerate(self.air_assets.values()) if 'portee_capteur_nm' in specs]
+        classes = ([list(self.naval_assets.values())[i] for i in navires]
+                   + [list(self.air_assets.values())[i] for i in avions])
+        disponibles = np.rint(np.vstack([
+            self.simulate_fleet_lifecycle(self.naval_assets, annees)['disponibles'].mean(axis=0)[navires],
+            self.simulate_fleet_lifecycle(self.air_assets, annees)['disponibles'].mean(axis=0)[avions]
+        ])).astype(int)
+        rayons_classe = MILLE_NAUTIQUE_KM * np.hstack([
+            np.outer(portee, [FACTEURS_PATROUILLE[specs['type']] for specs in classes[:len(navires)]]),
+            np.tile([specs['portee_capteur_nm'] for specs in classes[len(navires):]], (len(annees), 1))
+        ])
+        
+        # Stations fixes par classe, en tournesol autour de la base : l'unité k occupe la station k
+        maximum = disponibles.max(axis=1)
+        classe = np.repeat(np.arange(len(classes)), maximum)
+        rang = np.arange(len(classe)) - np.repeat(np.cumsum(maximum) - maximum, maximum)
+        distance = 2 * rayons_classe.max(axis=0)[classe] * np.sqrt(rang / np.maximum(maximum[classe], 1))
+        angle = rang * np.pi * (3 - np.sqrt(5))
+        x, y = grille.projeter([positions.loc[specs['base'], 'lon'] for specs in classes],
+                               [positions.loc[specs['base'], 'lat'] for specs in classes])
+        lon_unites, lat_unites = grille.deprojeter(np.asarray(x)[classe] + distance * np.cos(angle),
+                                                   np.asarray(y)[classe] + distance * np.sin(angle))
+        
+        # Rayons (années, capteurs) en km, nuls pour les unités non disponibles
+        lon = np.concatenate([radars['lon'], lon_unites])
+        lat = np.concatenate([radars['lat'], lat_unites])
+        rayons = np.hstack([
+            MILLE_NAUTIQUE_KM * np.outer(df['Couverture_Radar'].to_numpy() / 100, radars['portee_radar_nm']),
+            np.where(rang < disponibles[classe].T, rayons_classe[:, classe], 0.0)
+        ])
+        
+        statistiques = couverture_spatiale(lon, lat, rayons, FICHIER_GEO, resolution_km)
+        return pd.DataFrame({
+            'Annee': annees,
+            'Couverture_Spatiale': [100 * s['couverture'] for s in statistiques],
+            'Lacunes_ZEE': [100 * s['lacunes'] for s in statistiques],
+            'Chevauchement': [100 * s['chevauchement'] for s in statistiques]
+        })
+    
+    def simulate_maritime_interceptions(self, annees, config=None):
         """Interceptions maritimes réussies"""
-        return [min(20 + 3 * (annee - 2000), 150) for annee in annees]
+        return self._tendance(annees, config, 'interceptions')
     
-    def simulate_joint_exercises(self, annees):
+    def simulate_joint_exercises(self, annees, config=None):
         """Exercices combinés avec partenaires"""
-        return [min(5 + 2 * (annee - 2000), 40) for annee in annees]
+        return self._tendance(annees, config, 'exercices_combines')
     
-    def simulate_flight_hours(self, annees):
+    def simulate_flight_hours(self, annees, config=None):
         """Heures de vol de combat"""
-        return [min(800 + 50 * (annee - 2000), 2000) for annee in annees]
+        return self._tendance(annees, config, 'heures_vol')
     
     def simulate_aircraft_availability(self, annees):
-        """Taux de disponibilité des avions"""
-        return [min(60 + 1.5 * (annee - 2000), 85) for annee in annees]
+        """Taux de disponibilité des avions : cellules disponibles / en service (simulation du cycle de vie)"""
+        cycle_vie = self.simulate_fleet_lifecycle(self.air_assets, annees)
+        en_service = cycle_vie['en_service'].sum(axis=1).mean(axis=0)
+        return 100 * cycle_vie['disponibles'].sum(axis=1).mean(axis=0) / np.maximum(en_service, 1e-9)
     
-    def simulate_air_defense(self, annees):
+    def simulate_air_defense(self, annees, config=None):
         """Défense anti-aérienne"""
-        return [min(40 + 2.5 * (annee - 2000), 80) for annee in annees]
+        return self._tendance(annees, config, 'defense_aerienne')
     
-    def simulate_cyber_attacks(self, annees):
+    def simulate_cyber_attacks(self, annees, config=None):
         """Attaques cyber réussies (estimation)"""
-        return [max(3 + 1.5 * (annee - 2010), 0) for annee in annees]
+        annees = np.asarray(annees)
+        return np.maximum(self._parametre(config, 'attaques_cyber_base')
+                          + self._parametre(config, 'croissance_attaques_cyber') * (annees - 2010), 0)
     
-    def simulate_cyber_command(self, annees):
+    def simulate_cyber_command(self, annees, config=None):
         """Réseau de commandement cyber"""
-        return [min(30 + 4 * (annee - 2010), 85) for annee in annees]
+        return self._tendance(annees, config, 'commandement_cyber', origine=2010)
     
-    def simulate_cyber_defense(self, annees):
+    def simulate_cyber_defense(self, annees, config=None):
         """Capacités de cyber défense"""
-        return [min(40 + 3.5 * (annee - 2010), 82) for annee in annees]
+        return self._tendance(annees, config, 'cyber_defense', origine=2010)
+    
+    def simulate_parametric_batch(self, annees, config):
+        """Simule en un seul appel vectorisé les métriques paramétrées pour un lot de configurations"""
+        # Un paramètre de forme (n, 1) définit n variantes : chaque métrique est alors de forme (n, années)
+        n = max([np.shape(config[nom])[0] for nom in self.parametres_simulation
+                 if np.ndim(config.get(nom)) == 2] or [1])
+        # Toutes les séries paramétrées ; Navires_Patrouille et Taux_Disponibilite_Avions relèvent du cycle de vie
+        sorties = {
+            'Budget_Defense_Mds': self.simulate_advanced_budget(annees, config),
+            'Personnel_Milliers': self.simulate_advanced_personnel(annees, config),
+            'PIB_Militaire_Pourcent': self.simulate_military_gdp_percentage(annees, config),
+            'Exercices_Militaires': self.simulate_advanced_exercises(annees, config),
+            'Readiness_Operative': self.simulate_advanced_readiness(annees, config),
+            'Capacite_Dissuasion': self.simulate_advanced_deterrence(annees, config),
+            'Temps_Mobilisation_Jours': self.simulate_advanced_mobilization(annees, config),
+            'Patrouilles_Maritimes': self.simulate_maritime_patrols(annees, config),
+            'Developpement_Technologique': self.simulate_tech_development(annees, config),
+            'Capacite_Artillerie': self.simulate_artillery_capacity(annees, config),
+            'Couverture_Radar': self.simulate_radar_coverage(annees, config),
+            'Resilience_Logistique': self.simulate_logistical_resilience(annees, config),
+            'Cyber_Capabilities': self.simulate_cyber_capabilities(annees, config),
+            'Production_Munitions': self.simulate_ammunition_production(annees, config)
+        }
+        priorites = config.get('priorites', [])
+        if 'maritime' in priorites:
+            sorties.update({
+                'Portee_Surveillance_Nm': self.simulate_surveillance_range(annees, config),
+                'Interceptions_Maritimes': self.simulate_maritime_interceptions(annees, config),
+                'Exercices_Combines': self.simulate_joint_exercises(annees, config)
+            })
+        if 'aerien' in priorites:
+            sorties.update({
+                'Heures_Vol_Combat': self.simulate_flight_hours(annees, config),
+                'Couverture_AD': self.simulate_air_defense(annees, config)
+            })
+        if 'cyber' in priorites:
+            sorties.update({
+                'Attaques_Cyber_Reussies': self.simulate_cyber_attacks(annees, config),
+                'Reseau_Commandement_Cyber': self.simulate_cyber_command(annees, config),
+                'Cyber_Defense_Niveau': self.simulate_cyber_defense(annees, config)
+            })
+        return {metrique: np.broadcast_to(valeurs, (n, len(annees))) for metrique, valeurs in sorties.items()}
+    
+    def compute_sensitivities(self, selection, surcharges=None, pas_relatif=0.1, annee=None):
+        """Sensibilités (graphique tornade) par différences finies centrées, tous paramètres en un lot"""
+        annees = list(range(2000, 2028))
+        annee = annee or annees[-1]
+        config = {**self.get_advanced_config(selection), **(surcharges or {})}
+        
+        noms = self.parametres_applicables(config)
+        centre = np.array([float(self._parametre(config, nom)) for nom in noms])
+        # Pas additif : un paramètre nul est perturbé d'une fraction du pas de son curseur
+        pas = pas_relatif * np.maximum(np.abs(centre), [self.parametres_simulation[nom]['pas'] for nom in noms])
+        # Ligne 0 : point central ; lignes 2i+1 / 2i+2 : paramètre i perturbé à la hausse / à la baisse
+        matrice = np.tile(centre, (2 * len(noms) + 1, 1))
+        indices = np.arange(len(noms))
+        matrice[2 * indices + 1, indices] += pas
+        matrice[2 * indices + 2, indices] -= pas
+        
+        config_lot = {**config, **{nom: matrice[:, [i]] for i, nom in enumerate(noms)}}
+        sorties = self.simulate_parametric_batch(annees, config_lot)
+        colonne = annees.index(annee)
+        
+        lignes = []
+        for metrique, valeurs in sorties.items():
+            finales = valeurs[:, colonne]
+            haute, basse = finales[1::2], finales[2::2]
+            gradient = (haute - basse) / (2 * pas)
+            for i, nom in enumerate(noms):
+                lignes.append({
+                    'Metrique': metrique,
+                    'Parametre': nom,
+                    'Label': self.parametres_simulation[nom]['label'],
+                    'Valeur_Parametre': centre[i],
+                    'Sortie_Centrale': finales[0],
+                    'Sortie_Haute': haute[i],
+                    'Sortie_Basse': basse[i],
+                    'Gradient': gradient[i],
+                    'Amplitude': abs(haute[i] - basse[i])
+                })
+        return pd.DataFrame(lignes)
     
     def display_advanced_header(self):
         """En-tête avancé avec plus d'informations"""
@@ -401,11 +1909,18 @@ class DefenseSriLankaDashboardAvance:
         show_doctrinal = st.sidebar.checkbox("Analyse doctrinale", value=True)
         show_technical = st.sidebar.checkbox("Détails techniques", value=True)
         threat_assessment = st.sidebar.checkbox("Évaluation des menaces", value=True)
+        mode_rapport = st.sidebar.checkbox("Mode rapport (images statiques)", value=False)
         
         # Paramètres de simulation
         st.sidebar.markdown("### ⚙️ PARAMÈTRES DE SIMULATION")
         scenario = st.sidebar.selectbox("Scénario:", ["Statut Quo", "Tensions Régionales", "Modernisation Accélérée", "Crise Maritime"])
         
+        # Données réelles à superposer aux simulations
+        st.sidebar.markdown("### 📂 DONNÉES OBSERVÉES")
+        source_observee = st.sidebar.text_input("Fichier source (CSV, Parquet, SQLite):",
+                                                value=os.environ.get("SRI_LANKA_DONNEES_OBSERVEES", ""),
+                                                help=f"Chemin relatif au répertoire de données : {REPERTOIRE_DONNEES}")
+        
         return {
             'selection': selection,
             'type_analyse': type_analyse,
@@ -413,17 +1928,108 @@ class DefenseSriLankaDashboardAvance:
             'show_doctrinal': show_doctrinal,
             'show_technical': show_technical,
             'threat_assessment': threat_assessment,
-            'scenario': scenario
+            'mode_rapport': mode_rapport,
+            'scenario': scenario,
+            'source_observee': source_observee.strip()
         }
     
+    def build_composite_index(self, selections):
+        """Construit l'indice composite pour toutes les sélections en une seule agrégation"""
+        donnees = [self.shared_data(selection)[0] for selection in selections]
+        colonnes = list(dict.fromkeys(c for df in donnees for c in df.columns if c != 'Annee'))
+        valeurs = np.stack([df.reindex(columns=colonnes).to_numpy(dtype=float) for df in donnees])
+        profils = self.define_profils_ponderation()
+        poids = [[{**profils["Défaut"], **profils.get(selection, {})}.get(c, 0.0) for c in colonnes]
+                 for selection in selections]
+        sens = [-1 if c in ('Temps_Mobilisation_Jours', 'Attaques_Cyber_Reussies') else 1 for c in colonnes]
+        return IndiceComposite(valeurs, colonnes, poids, sens), list(donnees[0]['Annee'])
+    
+    def display_composite_index(self, controls):
+        """Indice composite de capacité de défense, pondérations ajustables"""
+        selection = controls['selection']
+        selections = list(dict.fromkeys(self.branches_options + self.programmes_options + [selection]))
+        
+        # L'indice est conservé dans la session : un changement de poids ne déclenche qu'une mise à jour différentielle
+        etat = st.session_state.get('indice_composite')
+        if etat is None or etat['selections'] != selections:
+            indice, annees = self.build_composite_index(selections)
+            etat = {'selections': selections, 'indice': indice, 'annees': annees}
+            st.session_state['indice_composite'] = etat
+        indice, annees = etat['indice'], etat['annees']
+        ligne = selections.index(selection)
+        
+        with st.expander("⚖️ Pondérations de l'indice composite", expanded=False):
+            colonnes = st.columns(4)
+            disponibles = [c for j, c in enumerate(indice.colonnes) if indice.present[ligne, ..., j].any()]
+            profils = self.define_profils_ponderation()
+            profil = {**profils["Défaut"], **profils.get(selection, {})}
+            for i, colonne in enumerate(disponibles):
+                with colonnes[i % 4]:
+                    poids = st.slider(colonne, 0.0, 5.0, float(profil.get(colonne, 0.0)), 0.5,
+                                      key=f"poids_{selection}_{colonne}")
+                indice.ajuster_poids(ligne, colonne, poids)
+        
+        valeurs = indice.valeurs()
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            st.markdown("""
+            <div class="metric-card">
+                <h4>🛡️ INDICE COMPOSITE DE DÉFENSE</h4>
+                <h2>{:.1f}/100</h2>
+                <p>📈 {:+.1f} pts depuis 2000</p>
+            </div>
+            """.format(valeurs[ligne, -1], valeurs[ligne, -1] - valeurs[ligne, 0]),
+            unsafe_allow_html=True)
+        
+        with col2:
+            fig = go.Figure()
+            for i, nom in enumerate(selections):
+                fig.add_trace(trace_serie(x=annees, y=valeurs[i], name=nom, mode='lines',
+                                          line=dict(width=5 if i == ligne else 1.5),
+                                          opacity=1.0 if i == ligne else 0.6))
+            fig.update_layout(title="🛡️ INDICE COMPOSITE PAR BRANCHE ET PROGRAMME",
+                              xaxis_title="Année", yaxis_title="Indice (0-100)",
+                              height=400, template=GABARIT_ALLEGE)
+            self.render_figure(fig)
+    
+    def compute_strategic_kpis(self, df):
+        """Indicateurs clés du tableau de bord stratégique (dernière année et évolution depuis 2000)"""
+        derniere_annee = df['Annee'].max()
+        data_actuelle = df[df['Annee'] == derniere_annee].iloc[0]
+        data_2000 = df[df['Annee'] == 2000].iloc[0]
+        
+        kpis = {
+            'annee': int(derniere_annee),
+            'budget_defense_mds': float(data_actuelle['Budget_Defense_Mds']),
+            'pib_militaire_pourcent': float(data_actuelle['PIB_Militaire_Pourcent']),
+            'personnel_milliers': float(data_actuelle['Personnel_Milliers']),
+            'croissance_personnel_pourcent': float(((data_actuelle['Personnel_Milliers'] - data_2000['Personnel_Milliers']) / data_2000['Personnel_Milliers']) * 100),
+            'capacite_dissuasion': float(data_actuelle['Capacite_Dissuasion']),
+            'patrouilles_maritimes': int(data_actuelle.get('Patrouilles_Maritimes', 0)),
+            'couverture_ad': float(data_actuelle.get('Couverture_AD', 0)),
+            'heures_vol_combat': int(data_actuelle.get('Heures_Vol_Combat', 0)),
+            'temps_mobilisation_jours': float(data_actuelle['Temps_Mobilisation_Jours']),
+            'reduction_temps_mobilisation_pourcent': float(((data_2000['Temps_Mobilisation_Jours'] - data_actuelle['Temps_Mobilisation_Jours']) / 
+                                                            data_2000['Temps_Mobilisation_Jours']) * 100),
+            'couverture_radar': float(data_actuelle['Couverture_Radar']),
+            'croissance_radar_pourcent': float(((data_actuelle['Couverture_Radar'] - data_2000['Couverture_Radar']) / 
+                                                data_2000['Couverture_Radar']) * 100),
+            'readiness_operative': float(data_actuelle['Readiness_Operative']),
+            'progression_readiness': float(data_actuelle['Readiness_Operative'] - data_2000['Readiness_Operative'])
+        }
+        if 'Portee_Surveillance_Nm' in df.columns:
+            kpis['portee_surveillance_nm'] = float(data_actuelle['Portee_Surveillance_Nm'])
+            kpis['croissance_portee_pourcent'] = float(((data_actuelle['Portee_Surveillance_Nm'] - data_2000.get('Portee_Surveillance_Nm', 50)) / 
+                                                        data_2000.get('Portee_Surveillance_Nm', 50)) * 100)
+        return kpis
+    
     def display_strategic_metrics(self, df, config):
         """Métriques stratégiques avancées"""
         st.markdown('<h3 class="section-header">🎯 TABLEAU DE BORD STRATÉGIQUE</h3>', 
                    unsafe_allow_html=True)
         
-        derniere_annee = df['Annee'].max()
-        data_actuelle = df[df['Annee'] == derniere_annee].iloc[0]
-        data_2000 = df[df['Annee'] == 2000].iloc[0]
+        kpis = self.compute_strategic_kpis(df)
         
         # Première ligne de métriques
         col1, col2, col3, col4 = st.columns(4)
@@ -435,7 +2041,7 @@ class DefenseSriLankaDashboardAvance:
                 <h2>{:.1f} Md$</h2>
                 <p>📈 {:.1f}% du PIB</p>
             </div>
-            """.format(data_actuelle['Budget_Defense_Mds'], data_actuelle['PIB_Militaire_Pourcent']), 
+            """.format(kpis['budget_defense_mds'], kpis['pib_militaire_pourcent']), 
             unsafe_allow_html=True)
         
         with col2:
@@ -445,8 +2051,7 @@ class DefenseSriLankaDashboardAvance:
                 <h2>{:,.0f}K</h2>
                 <p>⚔️ +{:.1f}% depuis 2000</p>
             </div>
-            """.format(data_actuelle['Personnel_Milliers'], 
-                     ((data_actuelle['Personnel_Milliers'] - data_2000['Personnel_Milliers']) / data_2000['Personnel_Milliers']) * 100), 
+            """.format(kpis['personnel_milliers'], kpis['croissance_personnel_pourcent']), 
             unsafe_allow_html=True)
         
         with col3:
@@ -456,8 +2061,7 @@ class DefenseSriLankaDashboardAvance:
                 <h2>{:.0f}%</h2>
                 <p>🚢 {} patrouilles/an</p>
             </div>
-            """.format(data_actuelle['Capacite_Dissuasion'], 
-                     int(data_actuelle.get('Patrouilles_Maritimes', 0))), 
+            """.format(kpis['capacite_dissuasion'], kpis['patrouilles_maritimes']), 
             unsafe_allow_html=True)
         
         with col4:
@@ -467,48 +2071,49 @@ class DefenseSriLankaDashboardAvance:
                 <h2>{:.0f}%</h2>
                 <p>🛩️ {} heures de vol</p>
             </div>
-            """.format(data_actuelle.get('Couverture_AD', 0), 
-                     int(data_actuelle.get('Heures_Vol_Combat', 0))), 
+            """.format(kpis['couverture_ad'], kpis['heures_vol_combat']), 
             unsafe_allow_html=True)
         
         # Deuxième ligne de métriques
         col5, col6, col7, col8 = st.columns(4)
         
         with col5:
-            reduction_temps = ((data_2000['Temps_Mobilisation_Jours'] - data_actuelle['Temps_Mobilisation_Jours']) / 
-                             data_2000['Temps_Mobilisation_Jours']) * 100
             st.metric(
                 "⏱️ Temps Mobilisation",
-                f"{data_actuelle['Temps_Mobilisation_Jours']:.1f} jours",
-                f"{reduction_temps:+.1f}%"
+                f"{kpis['temps_mobilisation_jours']:.1f} jours",
+                f"{kpis['reduction_temps_mobilisation_pourcent']:+.1f}%"
             )
         
         with col6:
-            croissance_radar = ((data_actuelle['Couverture_Radar'] - data_2000['Couverture_Radar']) / 
-                              data_2000['Couverture_Radar']) * 100
             st.metric(
                 "📡 Couverture Radar",
-                f"{data_actuelle['Couverture_Radar']:.1f}%",
-                f"{croissance_radar:+.1f}%"
+                f"{kpis['couverture_radar']:.1f}%",
+                f"{kpis['croissance_radar_pourcent']:+.1f}%"
             )
         
         with col7:
-            if 'Portee_Surveillance_Nm' in df.columns:
-                croissance_portee = ((data_actuelle['Portee_Surveillance_Nm'] - data_2000.get('Portee_Surveillance_Nm', 50)) / 
-                                   data_2000.get('Portee_Surveillance_Nm', 50)) * 100
+            if 'portee_surveillance_nm' in kpis:
                 st.metric(
                     "🌊 Portée Surveillance",
-                    f"{data_actuelle['Portee_Surveillance_Nm']:,.0f} nm",
-                    f"{croissance_portee:+.1f}%"
+                    f"{kpis['portee_surveillance_nm']:,.0f} nm",
+                    f"{kpis['croissance_portee_pourcent']:+.1f}%"
                 )
         
         with col8:
             st.metric(
                 "📊 Préparation Opérationnelle",
-                f"{data_actuelle['Readiness_Operative']:.1f}%",
-                f"+{(data_actuelle['Readiness_Operative'] - data_2000['Readiness_Operative']):.1f}%"
+                f"{kpis['readiness_operative']:.1f}%",
+                f"+{kpis['progression_readiness']:.1f}%"
             )
     
+    def define_colonnes_tableau_de_bord(self):
+        """Colonnes affichées par le tableau de bord (projection des sources observées)"""
+        return [
+            'Budget_Defense_Mds', 'Personnel_Milliers', 'Readiness_Operative', 'Capacite_Dissuasion',
+            'Cyber_Capabilities', 'Couverture_Radar', 'Patrouilles_Maritimes', 'Navires_Patrouille',
+            'Heures_Vol_Combat'
+        ]
+    
     def create_comprehensive_analysis(self, df, config):
         """Analyse complète multidimensionnelle"""
         st.markdown('<h3 class="section-header">📊 ANALYSE MULTIDIMENSIONNELLE</h3>', 
@@ -519,30 +2124,45 @@ class DefenseSriLankaDashboardAvance:
         
         with col1:
             # Évolution des capacités principales
-            fig = go.Figure()
-            
             capacites = ['Readiness_Operative', 'Capacite_Dissuasion', 'Cyber_Capabilities', 'Couverture_Radar']
             noms = ['Préparation Opér.', 'Dissuasion Strat.', 'Capacités Cyber', 'Couverture Radar']
             couleurs = ['#8D0034', '#FFB400', '#00534E', '#6A0C49']
+            colonnes = [c for cap in capacites for c in (cap, f"{cap}_Observe") if c in df.columns]
             
-            for i, (cap, nom, couleur) in enumerate(zip(capacites, noms, couleurs)):
-                if cap in df.columns:
-                    fig.add_trace(go.Scatter(
-                        x=df['Annee'], y=df[cap],
-                        mode='lines', name=nom,
-                        line=dict(color=couleur, width=4),
-                        hovertemplate=f"{nom}: %{{y:.1f}}%<extra></extra>"
-                    ))
+            def construire_capacites():
+                fig = go.Figure()
+                for cap, nom, couleur in zip(capacites, noms, couleurs):
+                    if cap in df.columns:
+                        fig.add_trace(trace_serie(
+                            x=df['Annee'], y=df[cap],
+                            mode='lines', name=nom,
+                            line=dict(color=couleur, width=4),
+                            hovertemplate=f"{nom}: %{{y:.1f}}%<extra></extra>"
+                        ))
+                    if f"{cap}_Observe" in df.columns:
+                        fig.add_trace(trace_serie(
+                            x=df['Annee'], y=df[f"{cap}_Observe"],
+                            mode='markers', name=f"{nom} (observé)",
+                            marker=dict(color=couleur, size=9, symbol='diamond'),
+                            hovertemplate=f"{nom} observé: %{{y:.1f}}%<extra></extra>"
+                        ))
+                
+                fig.update_layout(
+                    title="📈 ÉVOLUTION DES CAPACITÉS STRATÉGIQUES (2000-2027)",
+                    xaxis_title="Année",
+                    yaxis_title="Niveau de Capacité (%)",
+                    height=500,
+                    template=GABARIT_ALLEGE,
+                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+                )
+                return fig
             
-            fig.update_layout(
-                title="📈 ÉVOLUTION DES CAPACITÉS STRATÉGIQUES (2000-2027)",
-                xaxis_title="Année",
-                yaxis_title="Niveau de Capacité (%)",
-                height=500,
-                template="plotly_white",
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            # Changement de sélection : seules les ordonnées du gabarit sont remplacées
+            fig = self.shared_figure(
+                ('capacites', tuple(colonnes), self.data_signature(df, colonnes)),
+                lambda: figure_depuis_gabarit(('capacites', tuple(colonnes), tuple(df['Annee'])),
+                                              construire_capacites, [df[c] for c in colonnes]))
+            self.render_figure(fig, cle='capacites_strategiques')
         
         with col2:
             # Analyse des programmes stratégiques
@@ -561,22 +2181,29 @@ class DefenseSriLankaDashboardAvance:
                 strategic_data.append(df['Heures_Vol_Combat'] / 10)  # Normalisation
                 strategic_names.append('Heures Vol (x10)')
             
-            if strategic_data:
+            def construire_programmes():
                 fig = make_subplots(specs=[[{"secondary_y": True}]])
                 
                 for i, (data, nom) in enumerate(zip(strategic_data, strategic_names)):
                     fig.add_trace(
-                        go.Scatter(x=df['Annee'], y=data, name=nom,
-                                 line=dict(width=4)),
+                        trace_serie(x=df['Annee'], y=data, name=nom,
+                                    line=dict(width=4)),
                         secondary_y=(i > 0)
                     )
                 
                 fig.update_layout(
                     title="🚀 PROGRAMMES STRATÉGIQUES - ÉVOLUTION COMPARÉE",
                     height=500,
-                    template="plotly_white"
+                    template=GABARIT_ALLEGE
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                return fig
+            
+            if strategic_data:
+                fig = self.shared_figure(
+                    ('programmes', tuple(strategic_names), self.data_signature(pd.concat([df['Annee'], *strategic_data], axis=1))),
+                    lambda: figure_depuis_gabarit(('programmes', tuple(strategic_names), tuple(df['Annee'])),
+                                                  construire_programmes, strategic_data))
+                self.render_figure(fig, cle='programmes_strategiques')
     
     def create_geopolitical_analysis(self, df, config):
         """Analyse géopolitique avancée"""
@@ -609,29 +2236,140 @@ class DefenseSriLankaDashboardAvance:
             """, unsafe_allow_html=True)
         
         with col2:
-            # Analyse des défis sécuritaires
-            challenges_data = {
-                'Année': [2000, 2005, 2009, 2014, 2019, 2023],
-                'Niveau_Defi': [8, 9, 10, 4, 5, 6],  # sur 10
-                'Type_Defi': ['Conflit Civil', 'Conflit Civil', 'Fin Conflit', 'Reconstruction', 'Stabilité', 'Défis Maritimes']
-            }
-            challenges_df = pd.DataFrame(challenges_data)
-            
-            fig = px.line(challenges_df, x='Année', y='Niveau_Defi', 
-                         title="📉 ÉVOLUTION DES DÉFIS SÉCURITAIRES",
-                         labels={'Niveau_Defi': 'Niveau de Défi'},
-                         markers=True)
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            self.render_figure(self.shared_figure('defis_securitaires', self.build_security_challenges_figure))
             
-            # Indice de stabilité
-            stabilite = [min(30 + 3 * (annee - 2000), 85) for annee in df['Annee']]
-            fig = px.area(x=df['Annee'], y=stabilite,
-                         title="🕊️ INDICE DE STABILITÉ NATIONALE",
-                         labels={'x': 'Année', 'y': 'Niveau de Stabilité (%)'})
-            fig.update_traces(fillcolor='rgba(141, 0, 52, 0.3)', line_color='#8D0034')
-            fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+            annees = tuple(int(annee) for annee in df['Annee'])
+            self.render_figure(self.shared_figure(('stabilite', annees),
+                                                  lambda: self.build_stability_figure(annees)))
+        
+        # Carte des installations, zones maritimes et empreintes de couverture
+        self.display_strategic_map(df)
+    
+    def build_security_challenges_figure(self):
+        """Évolution des défis sécuritaires (indépendante de la sélection)"""
+        challenges_data = {
+            'Année': [2000, 2005, 2009, 2014, 2019, 2023],
+            'Niveau_Defi': [8, 9, 10, 4, 5, 6],  # sur 10
+            'Type_Defi': ['Conflit Civil', 'Conflit Civil', 'Fin Conflit', 'Reconstruction', 'Stabilité', 'Défis Maritimes']
+        }
+        challenges_df = pd.DataFrame(challenges_data)
+        
+        fig = px.line(challenges_df, x='Année', y='Niveau_Defi', 
+                     title="📉 ÉVOLUTION DES DÉFIS SÉCURITAIRES",
+                     labels={'Niveau_Defi': 'Niveau de Défi'},
+                     markers=True)
+        fig.update_layout(height=400)
+        return fig
+    
+    def build_stability_figure(self, annees):
+        """Indice de stabilité nationale sur les années simulées"""
+        stabilite = [min(30 + 3 * (annee - 2000), 85) for annee in annees]
+        fig = px.area(x=list(annees), y=stabilite,
+                     title="🕊️ INDICE DE STABILITÉ NATIONALE",
+                     labels={'x': 'Année', 'y': 'Niveau de Stabilité (%)'})
+        fig.update_traces(fillcolor='rgba(141, 0, 52, 0.3)', line_color='#8D0034')
+        fig.update_layout(height=300)
+        return fig
+    
+    def build_strategic_map(self, df, annee, zoom, centre):
+        """Carte des installations, de la ZEE et des empreintes de patrouille et de couverture radar"""
+        demi_largeur, _, taille_tuile = NIVEAUX_ZOOM_CARTE[zoom]
+        _, installations = charger_couches_geo(FICHIER_GEO)
+        if centre in installations['nom'].values:
+            lon0, lat0 = installations.loc[installations['nom'] == centre, ['lon', 'lat']].iloc[0]
+        else:
+            lon0, lat0 = CENTRE_SRI_LANKA
+        vue = (lon0 - demi_largeur, lat0 - demi_largeur, lon0 + demi_largeur, lat0 + demi_largeur)
+        tuiles = tuiles_vue(*vue, taille_tuile)
+        
+        ligne = df[df['Annee'] == annee].iloc[0]
+        couverture = ligne['Couverture_Radar'] / 100
+        if 'Portee_Surveillance_Nm' in df.columns:
+            portee_patrouille = ligne['Portee_Surveillance_Nm']
+        else:
+            portee_patrouille = self.simulate_surveillance_range([annee])[0]
+        
+        fig = go.Figure()
+        styles = {
+            'zee': dict(name="ZEE (tracé approximatif)", fillcolor='rgba(0, 83, 78, 0.08)',
+                        line=dict(color='#00534E', width=1.5, dash='dot')),
+            'cote': dict(name="Sri Lanka", fillcolor='#EFE8D8', line=dict(color='#6A0C49', width=1.5))
+        }
+        for couche, style in styles.items():
+            for i, (nom, anneau) in enumerate(geometrie_tuilee(FICHIER_GEO, couche, zoom, tuiles)):
+                fig.add_trace(go.Scatter(x=anneau[:, 0], y=anneau[:, 1], mode='lines', fill='toself',
+                                         hoverinfo='skip', legendgroup=couche, showlegend=(i == 0), **style))
+        
+        # Patrouille : portée de surveillance autour des bases navales ; radar : portée nominale × couverture
+        navales = installations[installations['type'] == 'naval']
+        lon, lat = empreintes_circulaires(navales['lon'], navales['lat'],
+                                          np.full(len(navales), portee_patrouille * MILLE_NAUTIQUE_KM))
+        fig.add_trace(go.Scatter(x=lon, y=lat, mode='lines', fill='toself', hoverinfo='skip',
+                                 name=f"Patrouille ({portee_patrouille:.0f} nm)",
+                                 fillcolor='rgba(255, 180, 0, 0.12)', line=dict(color='#FFB400', width=1)))
+        radars = installations.dropna(subset=['portee_radar_nm'])
+        lon, lat = empreintes_circulaires(radars['lon'], radars['lat'],
+                                          radars['portee_radar_nm'] * couverture * MILLE_NAUTIQUE_KM)
+        fig.add_trace(go.Scatter(x=lon, y=lat, mode='lines', fill='toself', hoverinfo='skip',
+                                 name=f"Radar ({couverture:.0%} de la portée nominale)",
+                                 fillcolor='rgba(141, 0, 52, 0.15)', line=dict(color='#8D0034', width=1)))
+        
+        symboles = {'naval': 'diamond', 'aerien': 'triangle-up', 'port': 'square', 'zone': 'x'}
+        fig.add_trace(go.Scatter(
+            x=installations['lon'], y=installations['lat'], mode='markers+text', name="Installations",
+            text=installations['nom'], textposition='top center', customdata=installations['role'],
+            marker=dict(size=12, color='#1F2937', symbol=installations['type'].map(symboles).fillna('circle')),
+            hovertemplate="<b>%{text}</b><br>%{customdata}<extra></extra>"
+        ))
+        
+        fig.update_layout(
+            title=f"🗺️ INSTALLATIONS STRATÉGIQUES ET ZONES MARITIMES ({annee})",
+            xaxis=dict(title="Longitude", range=[vue[0], vue[2]], showgrid=False),
+            # Même échelle kilométrique sur les deux axes à la latitude du centre
+            yaxis=dict(title="Latitude", range=[vue[1], vue[3]], showgrid=False,
+                       scaleanchor='x', scaleratio=1 / np.cos(np.radians(lat0))),
+            height=650, template=GABARIT_ALLEGE, plot_bgcolor='#DCEBF5',
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+        return fig
+    
+    def display_strategic_map(self, df):
+        """Carte stratégique avec choix du zoom, du centre et de l'année"""
+        st.markdown('<h3 class="section-header">🗺️ CARTE STRATÉGIQUE</h3>', 
+                   unsafe_allow_html=True)
+        
+        _, installations = charger_couches_geo(FICHIER_GEO)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            zoom = st.radio("Niveau de zoom", list(NIVEAUX_ZOOM_CARTE), index=1,
+                            horizontal=True, key='carte_zoom')
+        with col2:
+            centre = st.selectbox("Centrer sur", ["Sri Lanka", *installations['nom']], key='carte_centre')
+        with col3:
+            annee = st.slider("Année", int(df['Annee'].min()), int(df['Annee'].max()),
+                              int(df['Annee'].max()), key='carte_annee')
+        
+        self.render_figure(self.build_strategic_map(df, annee, zoom, centre), cle='carte_strategique')
+        
+        # Couverture spatiale de la ZEE (grille de 10 km) comparée à l'indicateur scalaire
+        couverture = self.simulate_spatial_coverage(df)
+        actuelle = couverture[couverture['Annee'] == annee].iloc[0]
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Couverture spatiale ZEE", f"{actuelle['Couverture_Spatiale']:.1f}%")
+        col2.metric("Lacunes", f"{actuelle['Lacunes_ZEE']:.1f}%")
+        col3.metric("Chevauchement", f"{actuelle['Chevauchement']:.1f}%")
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=couverture['Annee'], y=couverture['Couverture_Spatiale'],
+                                 name='Couverture spatiale ZEE', line=dict(color='#00534E', width=4)))
+        fig.add_trace(go.Scatter(x=couverture['Annee'], y=couverture['Chevauchement'],
+                                 name='Chevauchement', line=dict(color='#FFB400', width=3)))
+        fig.add_trace(go.Scatter(x=df['Annee'], y=df['Couverture_Radar'], name='Couverture radar (indicateur)',
+                                 line=dict(color='#8D0034', width=2, dash='dash')))
+        fig.update_layout(title="📡 COUVERTURE SPATIALE DE LA ZEE",
+                          xaxis_title="Année", yaxis_title="% des cellules maritimes",
+                          height=400, template=GABARIT_ALLEGE)
+        self.render_figure(fig)
     
     def create_technical_analysis(self, df, config):
         """Analyse technique détaillée"""
@@ -641,43 +2379,10 @@ class DefenseSriLankaDashboardAvance:
         col1, col2 = st.columns(2)
         
         with col1:
-            # Analyse des systèmes d'armes
-            systems_data = {
-                'Système': ['F-7G Skybolt', 'K-8 Karakorum', 'Mi-24 Hind', 
-                           'Navire Nandimithra', 'Frégate Sayura', 'Radar côtier'],
-                'Portée (km)': [1800, 800, 450, 2000, 4000, 300],
-                'Année Service': [2008, 2011, 2000, 2014, 2000, 2015],
-                'Statut': ['Opérationnel', 'Opérationnel', 'Modernisation', 'Opérationnel', 'Service', 'Opérationnel']
-            }
-            systems_df = pd.DataFrame(systems_data)
-            
-            fig = px.scatter(systems_df, x='Portée (km)', y='Année Service', 
-                           size='Portée (km)', color='Statut',
-                           hover_name='Système', log_x=True,
-                           title="🎯 CARACTÉRISTIQUES DES SYSTÈMES D'ARMES",
-                           size_max=30)
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            self.render_figure(self.shared_figure('systemes_armes', self.build_weapon_systems_figure))
         
         with col2:
-            # Analyse de la modernisation
-            modernization_data = {
-                'Domaine': ['Forces Terrestres', 'Marine', 
-                          'Force Aérienne', 'Cybersécurité', 'Renseignement'],
-                'Niveau 2000': [50, 40, 45, 20, 35],
-                'Niveau 2027': [75, 70, 72, 65, 68]
-            }
-            modern_df = pd.DataFrame(modernization_data)
-            
-            fig = go.Figure()
-            fig.add_trace(go.Bar(name='2000', x=modern_df['Domaine'], y=modern_df['Niveau 2000'],
-                                marker_color='#8D0034'))
-            fig.add_trace(go.Bar(name='2027', x=modern_df['Domaine'], y=modern_df['Niveau 2027'],
-                                marker_color='#FFB400'))
-            
-            fig.update_layout(title="📈 MODERNISATION DES CAPACITÉS MILITAIRES",
-                             barmode='group', height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            self.render_figure(self.shared_figure('modernisation', self.build_modernization_figure))
             
             # Cartographie des installations
             st.markdown("""
@@ -690,6 +2395,45 @@ class DefenseSriLankaDashboardAvance:
             </div>
             """, unsafe_allow_html=True)
     
+    def build_weapon_systems_figure(self):
+        """Caractéristiques des systèmes d'armes (indépendantes de la sélection)"""
+        systems_data = {
+            'Système': ['F-7G Skybolt', 'K-8 Karakorum', 'Mi-24 Hind', 
+                       'Navire Nandimithra', 'Frégate Sayura', 'Radar côtier'],
+            'Portée (km)': [1800, 800, 450, 2000, 4000, 300],
+            'Année Service': [2008, 2011, 2000, 2014, 2000, 2015],
+            'Statut': ['Opérationnel', 'Opérationnel', 'Modernisation', 'Opérationnel', 'Service', 'Opérationnel']
+        }
+        systems_df = pd.DataFrame(systems_data)
+        
+        fig = px.scatter(systems_df, x='Portée (km)', y='Année Service', 
+                       size='Portée (km)', color='Statut',
+                       hover_name='Système', log_x=True,
+                       title="🎯 CARACTÉRISTIQUES DES SYSTÈMES D'ARMES",
+                       size_max=30, render_mode=mode_rendu(len(systems_df)))
+        fig.update_layout(height=500)
+        return fig
+    
+    def build_modernization_figure(self):
+        """Modernisation des capacités militaires 2000-2027 (indépendante de la sélection)"""
+        modernization_data = {
+            'Domaine': ['Forces Terrestres', 'Marine', 
+                      'Force Aérienne', 'Cybersécurité', 'Renseignement'],
+            'Niveau 2000': [50, 40, 45, 20, 35],
+            'Niveau 2027': [75, 70, 72, 65, 68]
+        }
+        modern_df = pd.DataFrame(modernization_data)
+        
+        fig = go.Figure()
+        fig.add_trace(go.Bar(name='2000', x=modern_df['Domaine'], y=modern_df['Niveau 2000'],
+                            marker_color='#8D0034'))
+        fig.add_trace(go.Bar(name='2027', x=modern_df['Domaine'], y=modern_df['Niveau 2027'],
+                            marker_color='#FFB400'))
+        
+        fig.update_layout(title="📈 MODERNISATION DES CAPACITÉS MILITAIRES",
+                         barmode='group', height=500)
+        return fig
+    
     def create_doctrinal_analysis(self, config):
         """Analyse doctrinale avancée"""
         st.markdown('<h3 class="section-header">📚 ANALYSE DOCTRINALE</h3>', 
@@ -753,42 +2497,10 @@ class DefenseSriLankaDashboardAvance:
         col1, col2 = st.columns(2)
         
         with col1:
-            # Matrice des menaces
-            threats_data = {
-                'Type de Menace': ['Terrorisme Maritime', 'Trafic Illégal', 'Tensions Frontalières', 
-                                 'Cyber Attaque', 'Ingérence Étrangère', 'Instabilité Régionale'],
-                'Probabilité': [0.6, 0.8, 0.4, 0.7, 0.5, 0.3],
-                'Impact': [0.7, 0.6, 0.8, 0.5, 0.7, 0.6],
-                'Niveau Préparation': [0.8, 0.7, 0.6, 0.5, 0.4, 0.5]
-            }
-            threats_df = pd.DataFrame(threats_data)
-            
-            fig = px.scatter(threats_df, x='Probabilité', y='Impact', 
-                           size='Niveau Préparation', color='Type de Menace',
-                           title="🎯 MATRICE RISQUES - PROBABILITÉ VS IMPACT",
-                           size_max=30)
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            self.render_figure(self.shared_figure('menaces_matrice', self.build_threat_matrix_figure))
         
         with col2:
-            # Capacités de réponse
-            response_data = {
-                'Scénario': ['Crise Maritime', 'Trafic Drogues', 'Cyber Attaque', 
-                           'Tensions Frontalières', 'Catastrophe Naturelle'],
-                'Marine': [0.9, 0.8, 0.2, 0.4, 0.7],
-                'Air': [0.7, 0.3, 0.1, 0.8, 0.6],
-                'Terre': [0.4, 0.6, 0.3, 0.9, 0.8]
-            }
-            response_df = pd.DataFrame(response_data)
-            
-            fig = go.Figure(data=[
-                go.Bar(name='Marine', x=response_df['Scénario'], y=response_df['Marine']),
-                go.Bar(name='Air', x=response_df['Scénario'], y=response_df['Air']),
-                go.Bar(name='Terre', x=response_df['Scénario'], y=response_df['Terre'])
-            ])
-            fig.update_layout(title="🛡️ CAPACITÉS DE RÉPONSE PAR SCÉNARIO",
-                             barmode='group', height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            self.render_figure(self.shared_figure('menaces_reponse', self.build_response_capacity_figure))
         
         # Recommandations stratégiques
         st.markdown("""
@@ -805,20 +2517,64 @@ class DefenseSriLankaDashboardAvance:
         </div>
         """, unsafe_allow_html=True)
     
-    def create_naval_database(self):
+    def build_threat_matrix_figure(self):
+        """Matrice des menaces : probabilité, impact et niveau de préparation"""
+        threats_data = {
+            'Type de Menace': ['Terrorisme Maritime', 'Trafic Illégal', 'Tensions Frontalières', 
+                             'Cyber Attaque', 'Ingérence Étrangère', 'Instabilité Régionale'],
+            'Probabilité': [0.6, 0.8, 0.4, 0.7, 0.5, 0.3],
+            'Impact': [0.7, 0.6, 0.8, 0.5, 0.7, 0.6],
+            'Niveau Préparation': [0.8, 0.7, 0.6, 0.5, 0.4, 0.5]
+        }
+        threats_df = pd.DataFrame(threats_data)
+        
+        fig = px.scatter(threats_df, x='Probabilité', y='Impact', 
+                       size='Niveau Préparation', color='Type de Menace',
+                       title="🎯 MATRICE RISQUES - PROBABILITÉ VS IMPACT",
+                       size_max=30, render_mode=mode_rendu(len(threats_df)))
+        fig.update_layout(height=500)
+        return fig
+    
+    def build_response_capacity_figure(self):
+        """Capacités de réponse par scénario et par branche"""
+        response_data = {
+            'Scénario': ['Crise Maritime', 'Trafic Drogues', 'Cyber Attaque', 
+                       'Tensions Frontalières', 'Catastrophe Naturelle'],
+            'Marine': [0.9, 0.8, 0.2, 0.4, 0.7],
+            'Air': [0.7, 0.3, 0.1, 0.8, 0.6],
+            'Terre': [0.4, 0.6, 0.3, 0.9, 0.8]
+        }
+        response_df = pd.DataFrame(response_data)
+        
+        fig = go.Figure(data=[
+            go.Bar(name='Marine', x=response_df['Scénario'], y=response_df['Marine']),
+            go.Bar(name='Air', x=response_df['Scénario'], y=response_df['Air']),
+            go.Bar(name='Terre', x=response_df['Scénario'], y=response_df['Terre'])
+        ])
+        fig.update_layout(title="🛡️ CAPACITÉS DE RÉPONSE PAR SCÉNARIO",
+                         barmode='group', height=500)
+        return fig
+    
+    def create_naval_database(self, df):
         """Base de données des actifs navals"""
         st.markdown('<h3 class="section-header">⚓ BASE DE DONNÉES DES ACTIFS NAVALS</h3>', 
                    unsafe_allow_html=True)
         
+        # Statut de l'unité de tête et coques en service à mi-année de la dernière année simulée
+        annee = int(df['Annee'].max())
+        statuts = self.fleet_status(self.naval_assets, annee + 0.5)
+        en_service = self.simulate_fleet_lifecycle(self.naval_assets, [annee])['en_service'].mean(axis=0)[:, 0]
+        
         naval_data = []
-        for nom, specs in self.naval_assets.items():
+        for (nom, specs), statut, unites in zip(self.naval_assets.items(), statuts, en_service):
             naval_data.append({
                 'Navire': nom,
                 'Type': specs['type'],
                 'Tonnage': specs['tonnage'],
                 'Armement Principal': specs['armement'],
                 'Année Service': specs['annee'],
-                'Statut': 'Opérationnel' if specs['annee'] > 2000 else 'Modernisation'
+                'Statut': statut,
+                'En Service': f"{unites:.0f}/{specs.get('unites', 1)}"
             })
         
         naval_df = pd.DataFrame(naval_data)
@@ -831,9 +2587,9 @@ class DefenseSriLankaDashboardAvance:
                            size='Tonnage', color='Type',
                            hover_name='Navire', log_x=True,
                            title="⚓ CARACTÉRISTIQUES DE LA FLOTTE NAVALE",
-                           size_max=30)
+                           size_max=30, render_mode=mode_rendu(len(naval_df)))
             fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            self.render_figure(fig)
         
         with col2:
             st.markdown("""
@@ -847,36 +2603,206 @@ class DefenseSriLankaDashboardAvance:
                     <strong>{navire['Navire']}</strong><br>
                     ⚓ {navire['Type']} • 🚢 {navire['Tonnage']} t<br>
                     🎯 {navire['Armement Principal']}<br>
-                    📅 {navire['Année Service']} • {navire['Statut']}
+                    📅 {navire['Année Service']} • {navire['Statut']} • 🚢 {navire['En Service']} en service
                 </div>
                 """, unsafe_allow_html=True)
             
             st.markdown("</div>", unsafe_allow_html=True)
+        
+        # Cycle de vie : coques en service par classe et disponibilité (moyenne et intervalle 10-90% de l'ensemble)
+        annees = np.arange(2000, 2036)
+        naval = self.simulate_fleet_lifecycle(self.naval_assets, annees)
+        aerien = self.simulate_fleet_lifecycle(self.air_assets, annees)
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig = go.Figure()
+            for nom, serie in zip(self.naval_assets, naval['en_service'].mean(axis=0)):
+                fig.add_trace(go.Scatter(x=annees, y=serie, name=nom, mode='lines', stackgroup='flotte'))
+            fig.update_layout(title="♻️ CYCLE DE VIE DE LA FLOTTE - COQUES EN SERVICE",
+                              xaxis_title="Année", height=450, template=GABARIT_ALLEGE)
+            self.render_figure(fig)
+        
+        with col2:
+            fig = go.Figure()
+            for libelle, cycle_vie, couleur in (("Flotte navale", naval, '#00534E'), ("Aéronefs", aerien, '#8D0034')):
+                disponibilite = 100 * cycle_vie['disponibles'].sum(axis=1) / np.maximum(cycle_vie['en_service'].sum(axis=1), 1e-9)
+                basse, haute = np.percentile(disponibilite, [10, 90], axis=0)
+                fig.add_trace(go.Scatter(x=np.concatenate([annees, annees[::-1]]), y=np.concatenate([haute, basse[::-1]]),
+                                         fill='toself', line=dict(width=0), fillcolor=couleur, opacity=0.2,
+                                         hoverinfo='skip', showlegend=False))
+                fig.add_trace(go.Scatter(x=annees, y=disponibilite.mean(axis=0), name=libelle,
+                                         line=dict(color=couleur, width=4)))
+            fig.update_layout(title="🔧 DISPONIBILITÉ TECHNIQUE (MAINTENANCE, REFONTES, PANNES)",
+                              xaxis_title="Année", yaxis_title="Disponibilité (%)", height=450,
+                              template=GABARIT_ALLEGE)
+            self.render_figure(fig)
+    
+    def create_whatif_analysis(self, df, config, controls):
+        """Analyse what-if : curseurs sur les paramètres de simulation et sensibilités"""
+        st.markdown('<h3 class="section-header">🎚️ ANALYSE WHAT-IF ET SENSIBILITÉS</h3>',
+                   unsafe_allow_html=True)
+        
+        # Curseurs initialisés sur la configuration de la sélection courante
+        surcharges = {}
+        with st.expander("⚙️ Paramètres de simulation", expanded=False):
+            st.caption("Navires_Patrouille et Taux_Disponibilite_Avions sont issus de la simulation du cycle de vie "
+                       "des registres navals et aériens : ces curseurs ne les modifient pas.")
+            colonnes = st.columns(3)
+            for i, nom in enumerate(self.parametres_applicables(config)):
+                spec = self.parametres_simulation[nom]
+                valeur_base = float(min(max(self._parametre(config, nom), spec['min']), spec['max']))
+                with colonnes[i % 3]:
+                    valeur = st.slider(spec['label'], float(spec['min']), float(spec['max']),
+                                       valeur_base, float(spec['pas']),
+                                       key=f"whatif_{controls['selection']}_{nom}")
+                if valeur != valeur_base:
+                    surcharges[nom] = valeur
+        
+        df_whatif, config_whatif = self.generate_advanced_data(controls['selection'], surcharges)
+        sensibilites = self.compute_sensitivities(controls['selection'], surcharges)
+        
+        metriques = [m for m in sensibilites['Metrique'].unique() if m in df.columns]
+        metrique = st.selectbox("Métrique analysée:", metriques,
+                                index=metriques.index('Readiness_Operative'), key='whatif_metrique')
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=df['Annee'], y=df[metrique], name='Référence',
+                                     line=dict(color='#8D0034', width=3, dash='dash')))
+            fig.add_trace(go.Scatter(x=df_whatif['Annee'], y=df_whatif[metrique], name='What-If',
+                                     line=dict(color='#FFB400', width=4)))
+            fig.update_layout(title=f"🔀 {metrique} - RÉFÉRENCE VS WHAT-IF",
+                              xaxis_title="Année", height=500, template=GABARIT_ALLEGE)
+            self.render_figure(fig)
+        
+        with col2:
+            # Graphique tornade : effet d'une variation de ±10% de chaque paramètre en 2027
+            tornade = (sensibilites[(sensibilites['Metrique'] == metrique) & (sensibilites['Amplitude'] > 0)]
+                       .sort_values('Amplitude').tail(10))
+            centre = tornade['Sortie_Centrale'].iloc[0] if len(tornade) else 0
+            fig = go.Figure()
+            fig.add_trace(go.Bar(y=tornade['Label'], x=tornade['Sortie_Haute'] - centre, base=centre,
+                                 orientation='h', name='Paramètre +10%', marker_color='#00534E'))
+            fig.add_trace(go.Bar(y=tornade['Label'], x=tornade['Sortie_Basse'] - centre, base=centre,
+                                 orientation='h', name='Paramètre -10%', marker_color='#8D0034'))
+            fig.update_layout(title=f"🌪️ SENSIBILITÉS - {metrique} (2027)",
+                              barmode='overlay', height=500, template=GABARIT_ALLEGE)
+            self.render_figure(fig)
+        
+        # Paramètre le plus influent pour chaque métrique
+        dominants = sensibilites.loc[sensibilites.groupby('Metrique')['Amplitude'].idxmax(),
+                                     ['Metrique', 'Label', 'Gradient', 'Amplitude']]
+        st.dataframe(dominants.rename(columns={'Label': 'Paramètre dominant'}), use_container_width=True)
+    
+    def create_correlation_analysis(self, df):
+        """Corrélations et relations d'avance/retard entre toutes les séries"""
+        st.markdown('<h3 class="section-header">🔗 CORRÉLATIONS ET AVANCE/RETARD</h3>',
+                   unsafe_allow_html=True)
+        
+        analyse = analyser_correlations(df)
+        colonnes = analyse['colonnes']
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            decalage = st.slider("Décalage (années) :", min(analyse['valeurs_decalages']),
+                                 max(analyse['valeurs_decalages']), 0, key='correlation_decalage')
+            matrice = analyse['decalages'][analyse['valeurs_decalages'].index(decalage)]
+            fig = px.imshow(matrice, x=colonnes, y=colonnes, zmin=-1, zmax=1,
+                            color_continuous_scale='RdBu_r',
+                            title=f"🔗 CORRÉLATIONS CROISÉES (décalage {decalage:+d} ans)")
+            fig.update_layout(height=650)
+            self.render_figure(fig)
+        
+        with col2:
+            fig = px.imshow(analyse['meilleur_decalage'], zmin=-max(analyse['valeurs_decalages']),
+                            zmax=max(analyse['valeurs_decalages']), color_continuous_scale='PuOr',
+                            title="⏩ DÉCALAGE OPTIMAL (ligne en avance si > 0)")
+            fig.update_traces(customdata=analyse['meilleure_correlation'].to_numpy(),
+                              hovertemplate="%{y} → %{x}<br>Décalage: %{z} ans<br>Corrélation: %{customdata:.2f}<extra></extra>")
+            fig.update_layout(height=650)
+            self.render_figure(fig)
+        
+        # Corrélation glissante d'une paire
+        col3, col4 = st.columns(2)
+        with col3:
+            serie_a = st.selectbox("Série A :", colonnes, index=colonnes.index('Budget_Defense_Mds'),
+                                   key='correlation_serie_a')
+        with col4:
+            serie_b = st.selectbox("Série B :", colonnes, index=colonnes.index('Readiness_Operative'),
+                                   key='correlation_serie_b')
+        glissante = analyse['glissantes'][:, colonnes.index(serie_a), colonnes.index(serie_b)]
+        fig = px.line(x=analyse['annees_glissantes'], y=glissante, markers=True,
+                      title=f"📉 CORRÉLATION GLISSANTE - {serie_a} / {serie_b}",
+                      labels={'x': 'Année', 'y': 'Corrélation'})
+        fig.update_layout(height=350, yaxis_range=[-1.05, 1.05])
+        self.render_figure(fig)
+    
+    def render_figure(self, fig, cle=None):
+        """Affiche une figure : interactive, ou image statique pré-rendue en mode rapport"""
+        if self.mode_rapport:
+            # Rendu différé : toutes les figures de la page sont rendues en parallèle
+            self.rendus_en_attente.append((st.empty(), exporter_figure(fig), fig))
+        else:
+            # Une clé stable conserve le composant côté navigateur, qui applique la nouvelle figure par différence
+            st.plotly_chart(fig, use_container_width=True, key=cle)
+    
+    def finalize_report_images(self):
+        """Remplace les emplacements réservés par les images rendues (repli interactif si kaleido est absent)"""
+        erreurs = set()
+        for emplacement, futur, fig in self.rendus_en_attente:
+            try:
+                emplacement.image(futur.result(timeout=120), use_container_width=True)
+            except Exception as erreur:
+                erreurs.add(str(erreur))
+                emplacement.plotly_chart(fig, use_container_width=True)
+        self.rendus_en_attente = []
+        for erreur in erreurs:
+            st.sidebar.warning(f"Rendu statique indisponible : {erreur}")
     
     def run_advanced_dashboard(self):
         """Exécute le dashboard avancé complet"""
+        debut = time.perf_counter()
+        
         # Sidebar avancé
         controls = self.create_advanced_sidebar()
+        self.mode_rapport = controls['mode_rapport']
         
         # Header avancé
         self.display_advanced_header()
         
         # Génération des données avancées
-        df, config = self.generate_advanced_data(controls['selection'])
+        df, config = self.shared_data(controls['selection'])
+        
+        # Superposition des séries observées (colonnes du tableau de bord uniquement)
+        if controls['source_observee']:
+            try:
+                observe = self.load_observed_data(controls['source_observee'], controls['selection'],
+                                                  self.define_colonnes_tableau_de_bord())
+                df = self.overlay_observed_data(df, observe)
+            except (OSError, ValueError, ImportError, sqlite3.Error) as erreur:
+                st.sidebar.warning(f"Source observée indisponible : {erreur}")
         
         # Navigation par onglets avancés
-        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
+        onglets = [
             "📊 Tableau de Bord", 
             "🔬 Analyse Technique", 
             "🌍 Contexte Géopolitique", 
             "📚 Doctrine Militaire",
             "⚠️ Évaluation Menaces",
             "⚓ Actifs Navals",
-            "💎 Synthèse Stratégique"
-        ])
+            "💎 Synthèse Stratégique",
+            "🎚️ What-If",
+            "🔗 Corrélations"
+        ]
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs(onglets)
         
         with tab1:
             self.display_strategic_metrics(df, config)
+            self.display_composite_index(controls)
             self.create_comprehensive_analysis(df, config)
         
         with tab2:
@@ -896,10 +2822,40 @@ class DefenseSriLankaDashboardAvance:
         
         with tab6:
             if controls['show_technical']:
-                self.create_naval_database()
+                self.create_naval_database(df)
         
         with tab7:
             self.create_strategic_synthesis(df, config, controls)
+        
+        with tab8:
+            self.create_whatif_analysis(df, config, controls)
+        
+        with tab9:
+            self.create_correlation_analysis(df)
+        
+        if self.mode_rapport:
+            self.finalize_report_images()
+        
+        # Onglets dont le contenu a été rendu (tous les onglets sont exécutés à chaque réexécution)
+        masques = {onglets[2]: not controls['show_geopolitical'], onglets[3]: not controls['show_doctrinal'],
+                   onglets[4]: not controls['threat_assessment'], onglets[5]: not controls['show_technical']}
+        self.record_interaction(controls, [o for o in onglets if not masques.get(o)], time.perf_counter() - debut)
+    
+    def record_interaction(self, controls, onglets, duree):
+        """Journalise les interactions de la session (SRI_LANKA_ENREGISTREMENT) pour un rejeu ultérieur"""
+        repertoire = os.environ.get("SRI_LANKA_ENREGISTREMENT")
+        if not repertoire:
+            return
+        session = st.session_state.setdefault('id_session', uuid.uuid4().hex)
+        # Widgets des onglets (hors panneau latéral, déjà dans controls) : tous ont une clé stable préfixée
+        widgets = {cle: valeur for cle, valeur in st.session_state.items()
+                   if isinstance(cle, str)
+                   and cle.startswith(('whatif_', 'poids_', 'carte_', 'correlation_', 'prevision_'))}
+        enregistrement = {'horodatage': time.time(), 'controls': controls, 'widgets': widgets,
+                          'onglets': onglets, 'duree': duree}
+        os.makedirs(repertoire, exist_ok=True)
+        with open(os.path.join(repertoire, f"{session}.jsonl"), 'a', encoding='utf-8') as fichier:
+            fichier.write(json.dumps(enregistrement, ensure_ascii=False) + "\n")
     
     def create_strategic_synthesis(self, df, config, controls):
         """Synthèse stratégique finale"""
@@ -979,6 +2935,36 @@ class DefenseSriLankaDashboardAvance:
         </div>
         """, unsafe_allow_html=True)
         
+        # Projections 2028-2035
+        prevision, borne_basse, borne_haute = self.forecast_data(df, controls['selection'], config)
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            metriques = list(prevision.columns)
+            metrique = st.selectbox("Série projetée:", metriques,
+                                    index=metriques.index('Readiness_Operative'), key='prevision_metrique')
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=df['Annee'], y=df[metrique], name='Simulation 2000-2027',
+                                     line=dict(color='#8D0034', width=4)))
+            fig.add_trace(go.Scatter(x=list(borne_haute.index) + list(borne_basse.index[::-1]),
+                                     y=list(borne_haute[metrique]) + list(borne_basse[metrique][::-1]),
+                                     fill='toself', fillcolor='rgba(255, 180, 0, 0.25)',
+                                     line=dict(width=0), name='Intervalle 90%', hoverinfo='skip'))
+            fig.add_trace(go.Scatter(x=prevision.index, y=prevision[metrique], name='Projection',
+                                     line=dict(color='#FFB400', width=4, dash='dash')))
+            fig.update_layout(title=f"🔮 PROJECTION {metrique} (2028-2035)",
+                              xaxis_title="Année", height=450, template=GABARIT_ALLEGE)
+            self.render_figure(fig)
+        
+        with col2:
+            projections = pd.DataFrame({
+                '2027': df.set_index('Annee').loc[df['Annee'].max(), prevision.columns],
+                '2035': prevision.iloc[-1],
+                'Borne basse': borne_basse.iloc[-1],
+                'Borne haute': borne_haute.iloc[-1]
+            })
+            st.dataframe(projections.round(1), use_container_width=True, height=450)
+        
         # Recommandations finales
         st.markdown("""
         <div class="special-forces-card">
@@ -1004,5 +2990,6 @@ class DefenseSriLankaDashboardAvance:
 
 # Lancement du dashboard avancé
 if __name__ == "__main__":
+    configure_page()
     dashboard = DefenseSriLankaDashboardAvance()
     dashboard.run_advanced_dashboard()
\ No newline at end of file
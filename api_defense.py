@@ -0,0 +1,318 @@
+# api_defense.py
+# Service HTTP/JSON exposant les séries, indicateurs et inventaires du dashboard sans l'interface Streamlit
+import argparse
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+from Dashboard import DefenseSriLankaDashboardAvance, charger_sessions
+
+try:
+    import pyarrow as pa
+except ImportError:  # Format Arrow optionnel
+    pa = None
+
+STATUTS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 406: "Not Acceptable", 413: "Content Too Large", 414: "URI Too Long",
+           431: "Request Header Fields Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+# Les routes n'utilisent aucun corps de requête : seul un petit corps est lu puis ignoré
+TAILLE_CORPS_MAX = 64 * 1024
+SELECTION_PAR_DEFAUT = "Forces Armées Sri Lankaises"
+
+
+def accepte_gzip(entete):
+    """Vrai si Accept-Encoding autorise gzip (valeur q > 0, directement ou via *)"""
+    valeurs = {}
+    for element in entete.split(','):
+        codage, *parametres = [partie.strip() for partie in element.split(';')]
+        q = 1.0
+        for parametre in parametres:
+            nom, _, valeur = parametre.partition('=')
+            if nom.strip().lower() == 'q':
+                try:
+                    q = float(valeur)
+                except ValueError:
+                    q = 0.0
+        if codage:
+            valeurs[codage.lower()] = q
+    return valeurs.get('gzip', valeurs.get('x-gzip', valeurs.get('*', 0.0))) > 0
+
+
+class ErreurRequete(Exception):
+    def __init__(self, statut, message):
+        super().__init__(message)
+        self.statut = statut
+
+
+class ServiceAPIDefense:
+    """Service HTTP asynchrone avec cache de réponses, ETags et compression gzip"""
+
+    def __init__(self, taille_cache=256):
+        self.dashboard = DefenseSriLankaDashboardAvance()
+        self.selections = self.dashboard.branches_options + self.dashboard.programmes_options
+        self.taille_cache = taille_cache
+        self._cache = OrderedDict()
+        self._verrou = threading.Lock()
+        self.pret = threading.Event()
+        self.etat_prechauffage = {'pret': False}
+        self.routes = {
+            '/series': self.route_series,
+            '/kpi': self.route_kpi,
+            '/actifs': self.route_actifs,
+            '/selections': self.route_selections
+        }
+
+    # --- Routes -----------------------------------------------------------
+
+    def _parametres_selection(self, parametres):
+        # Le scénario n'est utilisé nulle part (ni séries, ni projections) : refusé plutôt qu'ignoré
+        if 'scenario' in parametres:
+            raise ErreurRequete(400, "Paramètre scenario non pris en charge : les séries ne dépendent pas du scénario")
+        selection = parametres.get('selection', SELECTION_PAR_DEFAUT)
+        if selection not in self.selections and selection != "Scénarios Géopolitiques":
+            raise ErreurRequete(404, f"Sélection inconnue : {selection}")
+        return selection
+
+    def route_series(self, parametres):
+        """Séries annuelles d'une sélection, filtrées par années et colonnes"""
+        selection = self._parametres_selection(parametres)
+        df, _ = self.dashboard.shared_data(selection)
+        try:
+            debut = int(parametres.get('debut', df['Annee'].min()))
+            fin = int(parametres.get('fin', df['Annee'].max()))
+        except ValueError:
+            raise ErreurRequete(400, "Les paramètres debut et fin doivent être des années")
+        df = df[(df['Annee'] >= debut) & (df['Annee'] <= fin)]
+        if 'colonnes' in parametres:
+            colonnes = [c for c in parametres['colonnes'].split(',') if c]
+            inconnues = [c for c in colonnes if c not in df.columns]
+            if inconnues:
+                raise ErreurRequete(400, f"Colonnes inconnues : {', '.join(inconnues)}")
+            df = df[['Annee', *[c for c in colonnes if c != 'Annee']]]
+        return {'selection': selection}, df.reset_index(drop=True)
+
+    def route_kpi(self, parametres):
+        """Indicateurs clés du tableau de bord stratégique"""
+        selection = self._parametres_selection(parametres)
+        df, _ = self.dashboard.shared_data(selection)
+        return {'selection': selection,
+                'kpi': self.dashboard.compute_strategic_kpis(df)}, None
+
+    def route_actifs(self, parametres):
+        """Inventaire des actifs navals et aériens"""
+        return {'naval': self.dashboard.naval_assets, 'aerien': self.dashboard.air_assets}, None
+
+    def route_selections(self, parametres):
+        """Sélections disponibles"""
+        return {'branches': self.dashboard.branches_options,
+                'programmes': self.dashboard.programmes_options}, None
+
+    def route_sante(self):
+        """Disponibilité du service : 503 tant que le préchauffage n'est pas terminé"""
+        statut = 200 if self.pret.is_set() else 503
+        return statut, json.dumps(self.etat_prechauffage, ensure_ascii=False).encode('utf-8')
+
+    # --- Préchauffage -----------------------------------------------------
+
+    def prechauffer(self, selections):
+        """Remplit le cache de réponses pour les sélections les plus demandées"""
+        debut = time.perf_counter()
+        cibles = [('/actifs', {}), ('/selections', {})]
+        for selection in selections:
+            cibles += [('/series', {'selection': selection}), ('/kpi', {'selection': selection})]
+        try:
+            for chemin, parametres in cibles:
+                self.reponse(chemin, parametres, 'json')
+        except Exception as erreur:
+            # Le service reste indisponible : un préchauffage en échec signale un déploiement défectueux
+            self.etat_prechauffage = {'pret': False, 'erreur': repr(erreur)}
+            return
+        self.etat_prechauffage = {'pret': True, 'reponses': len(cibles),
+                                  'selections': list(selections),
+                                  'duree_s': round(time.perf_counter() - debut, 3)}
+        self.pret.set()
+
+    # --- Encodage et cache ------------------------------------------------
+
+    def _encoder(self, meta, df, format_reponse):
+        if format_reponse == 'arrow':
+            if df is None:
+                raise ErreurRequete(406, "Format Arrow disponible uniquement pour /series")
+            if pa is None:
+                raise ErreurRequete(406, "Format Arrow indisponible : pyarrow n'est pas installé")
+            table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(
+                {k.encode(): str(v).encode() for k, v in meta.items()})
+            tampon = io.BytesIO()
+            with pa.ipc.new_stream(tampon, table.schema) as flux:
+                flux.write_table(table)
+            return tampon.getvalue(), 'application/vnd.apache.arrow.stream'
+        if df is not None:
+            meta = {**meta, 'colonnes': list(df.columns), 'donnees': df.to_dict(orient='list')}
+        return json.dumps(meta, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8'
+
+    def reponse(self, chemin, parametres, format_reponse):
+        """Réponse mise en cache : (corps, corps gzip, type, ETag) par route, paramètres et format"""
+        cle = (chemin, tuple(sorted(parametres.items())), format_reponse)
+        with self._verrou:
+            if cle in self._cache:
+                self._cache.move_to_end(cle)
+                return self._cache[cle]
+        if chemin not in self.routes:
+            raise ErreurRequete(404, f"Route inconnue : {chemin}")
+        meta, df = self.routes[chemin](parametres)
+        corps, type_contenu = self._encoder(meta, df, format_reponse)
+        entree = (corps, gzip.compress(corps, 6), type_contenu, '"%s"' % hashlib.sha1(corps).hexdigest())
+        with self._verrou:
+            self._cache[cle] = entree
+            if len(self._cache) > self.taille_cache:
+                self._cache.popitem(last=False)
+        return entree
+
+    # --- Protocole HTTP ---------------------------------------------------
+
+    async def traiter_connexion(self, lecteur, ecrivain):
+        boucle = asyncio.get_running_loop()
+        try:
+            while True:
+                # Ligne ou en-tête plus long que la limite du flux : readline lève ValueError
+                try:
+                    ligne = await lecteur.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    await self._ecrire_erreur(ecrivain, 414, "Ligne de requête trop longue")
+                    break
+                if not ligne:
+                    break
+                try:
+                    methode, cible, version = ligne.decode('latin-1').split()
+                except ValueError:
+                    break
+                try:
+                    entetes = await self._lire_entetes(lecteur)
+                except (ValueError, asyncio.LimitOverrunError):
+                    await self._ecrire_erreur(ecrivain, 431, "En-têtes trop longs")
+                    break
+                garder = entetes.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                # Corps éventuel ignoré mais consommé, pour que la requête suivante soit lue au bon endroit
+                if 'transfer-encoding' in entetes:
+                    garder = False
+                else:
+                    try:
+                        longueur = int(entetes.get('content-length', 0))
+                    except ValueError:
+                        longueur = -1
+                    if longueur < 0:
+                        await self._ecrire_erreur(ecrivain, 400, "Content-Length invalide")
+                        break
+                    if longueur > TAILLE_CORPS_MAX:
+                        await self._ecrire_erreur(ecrivain, 413, f"Corps limité à {TAILLE_CORPS_MAX} octets")
+                        break
+                    if longueur > 0:
+                        await lecteur.readexactly(longueur)
+                await self._repondre(boucle, ecrivain, methode, cible, entetes, garder)
+                if not garder:
+                    break
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            ecrivain.close()
+
+    async def _lire_entetes(self, lecteur):
+        entetes = {}
+        while True:
+            ligne = await lecteur.readline()
+            if ligne in (b'\r\n', b'\n', b''):
+                return entetes
+            nom, _, valeur = ligne.decode('latin-1').partition(':')
+            entetes[nom.strip().lower()] = valeur.strip()
+
+    async def _ecrire_erreur(self, ecrivain, statut, message):
+        """Réponse d'erreur de protocole, la connexion est ensuite fermée"""
+        corps = json.dumps({'erreur': message}, ensure_ascii=False).encode('utf-8')
+        await self._ecrire(ecrivain, 'GET', statut, 'application/json; charset=utf-8', corps, False, {})
+
+    async def _repondre(self, boucle, ecrivain, methode, cible, entetes, garder):
+        url = urlsplit(cible)
+        parametres = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        format_reponse = parametres.pop('format', None)
+        if format_reponse is None:
+            format_reponse = 'arrow' if 'arrow' in entetes.get('accept', '') else 'json'
+        supplementaires = {}
+        try:
+            if methode not in ('GET', 'HEAD'):
+                raise ErreurRequete(405, "Méthode non autorisée")
+            if url.path.rstrip('/') == '/sante':
+                # Jamais mise en cache : l'état change à la fin du préchauffage
+                statut, corps = self.route_sante()
+                type_contenu, supplementaires = 'application/json; charset=utf-8', {'Cache-Control': 'no-store'}
+            else:
+                if format_reponse not in ('json', 'arrow'):
+                    raise ErreurRequete(406, f"Format inconnu : {format_reponse}")
+                # Le calcul (génération des données) s'exécute hors de la boucle d'événements
+                corps, corps_gzip, type_contenu, etag = await boucle.run_in_executor(
+                    None, self.reponse, url.path.rstrip('/') or '/', parametres, format_reponse)
+                supplementaires = {'ETag': etag, 'Cache-Control': 'public, max-age=60',
+                                   'Vary': 'Accept, Accept-Encoding'}
+                if etag in [e.strip() for e in entetes.get('if-none-match', '').split(',')]:
+                    statut, corps = 304, b''
+                else:
+                    statut = 200
+                    if accepte_gzip(entetes.get('accept-encoding', '')):
+                        corps = corps_gzip
+                        supplementaires['Content-Encoding'] = 'gzip'
+        except ErreurRequete as erreur:
+            statut, type_contenu = erreur.statut, 'application/json; charset=utf-8'
+            corps = json.dumps({'erreur': str(erreur)}, ensure_ascii=False).encode('utf-8')
+        except Exception as erreur:
+            statut, type_contenu = 500, 'application/json; charset=utf-8'
+            corps = json.dumps({'erreur': repr(erreur)}).encode('utf-8')
+        await self._ecrire(ecrivain, methode, statut, type_contenu, corps, garder, supplementaires)
+
+    async def _ecrire(self, ecrivain, methode, statut, type_contenu, corps, garder, supplementaires):
+        lignes = [f"HTTP/1.1 {statut} {STATUTS[statut]}", f"Content-Type: {type_contenu}",
+                  f"Content-Length: {len(corps)}", f"Connection: {'keep-alive' if garder else 'close'}"]
+        lignes += [f"{nom}: {valeur}" for nom, valeur in supplementaires.items()]
+        ecrivain.write(("\r\n".join(lignes) + "\r\n\r\n").encode('latin-1'))
+        if methode != 'HEAD':
+            ecrivain.write(corps)
+        await ecrivain.drain()
+
+    async def servir(self, hote, port, selections=()):
+        serveur = await asyncio.start_server(self.traiter_connexion, hote, port)
+        print(f"API défense Sri Lanka à l'écoute sur http://{hote}:{port}")
+        # /sante répond 503 pendant le préchauffage, exécuté hors de la boucle d'événements
+        asyncio.get_running_loop().run_in_executor(None, self.prechauffer, list(selections))
+        async with serveur:
+            await serveur.serve_forever()
+
+
+def selections_frequentes(chemins, nombre=8):
+    """Sélections à précalculer : celle par défaut, puis les plus présentes dans les sessions enregistrées"""
+    comptes = Counter(interaction['controls']['selection']
+                      for session in charger_sessions([chemin for chemin in chemins if os.path.exists(chemin)])
+                      for interaction in session)
+    return [SELECTION_PAR_DEFAUT, *(selection for selection, _ in comptes.most_common()
+                                    if selection != SELECTION_PAR_DEFAUT)][:nombre]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service HTTP/JSON des données du dashboard défense Sri Lanka")
+    parser.add_argument('--hote', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--taille-cache', type=int, default=256)
+    parser.add_argument('--prechauffage', type=int, default=8,
+                        help="Sélections précalculées au démarrage : défaut puis les plus enregistrées")
+    parser.add_argument('--enregistrements', nargs='*', default=[os.environ.get("SRI_LANKA_ENREGISTREMENT", "")])
+    args = parser.parse_args()
+    selections = selections_frequentes(args.enregistrements, args.prechauffage) if args.prechauffage > 0 else []
+    asyncio.run(ServiceAPIDefense(args.taille_cache).servir(args.hote, args.port, selections))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# charge_api.py
+# Test de charge du service api_defense.py : débit et percentiles de latence
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+SELECTIONS = ["Forces Armées Sri Lankaises", "Marine Sri Lankaise", "Force Aérienne Sri Lankaise",
+              "Armée de Terre", "Modernisation des Forces"]
+
+
+def construire_cibles():
+    """Mélange de requêtes représentatif des systèmes qui interrogent l'API"""
+    cibles = ["/actifs", "/selections"]
+    for selection in SELECTIONS:
+        s = quote(selection)
+        cibles += [f"/series?selection={s}", f"/kpi?selection={s}",
+                   f"/series?selection={s}&debut=2015&fin=2027&colonnes=Budget_Defense_Mds,Readiness_Operative"]
+    return cibles
+
+
+async def client(hote, port, cibles, fin, latences, statuts, gzip_actif, etags):
+    lecteur, ecrivain = await asyncio.open_connection(hote, port)
+    try:
+        while time.perf_counter() < fin:
+            cible = random.choice(cibles)
+            entetes = [f"GET {cible} HTTP/1.1", f"Host: {hote}:{port}"]
+            if gzip_actif:
+                entetes.append("Accept-Encoding: gzip")
+            if etags is not None and cible in etags:
+                entetes.append(f"If-None-Match: {etags[cible]}")
+            debut = time.perf_counter()
+            ecrivain.write(("\r\n".join(entetes) + "\r\n\r\n").encode('latin-1'))
+            await ecrivain.drain()
+
+            statut = int((await lecteur.readline()).split()[1])
+            longueur, etag = 0, None
+            while True:
+                ligne = await lecteur.readline()
+                if ligne in (b'\r\n', b''):
+                    break
+                nom, _, valeur = ligne.decode('latin-1').partition(':')
+                if nom.lower() == 'content-length':
+                    longueur = int(valeur)
+                elif nom.lower() == 'etag':
+                    etag = valeur.strip()
+            await lecteur.readexactly(longueur)
+            latences.append(time.perf_counter() - debut)
+            statuts[statut] += 1
+            if etags is not None and etag:
+                etags[cible] = etag
+    finally:
+        ecrivain.close()
+
+
+async def executer(url, concurrence, duree, gzip_actif, avec_etags):
+    adresse = urlsplit(url)
+    latences, statuts = [], Counter()
+    etags = {} if avec_etags else None
+    debut = time.perf_counter()
+    await asyncio.gather(*[client(adresse.hostname, adresse.port or 80, construire_cibles(), debut + duree,
+                                  latences, statuts, gzip_actif, etags)
+                           for _ in range(concurrence)])
+    ecoule = time.perf_counter() - debut
+    return latences, statuts, ecoule
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de l'API défense Sri Lanka")
+    parser.add_argument('--url', default='http://127.0.0.1:8600')
+    parser.add_argument('--concurrence', type=int, default=16)
+    parser.add_argument('--duree', type=float, default=10.0, help="Durée du test (secondes)")
+    parser.add_argument('--gzip', action='store_true', help="Demande des réponses compressées")
+    parser.add_argument('--etags', action='store_true', help="Renvoie les ETags reçus (If-None-Match)")
+    args = parser.parse_args()
+
+    latences, statuts, ecoule = asyncio.run(executer(args.url, args.concurrence, args.duree, args.gzip, args.etags))
+    latences_ms = np.array(latences) * 1000
+    print(f"Requêtes : {len(latences)} en {ecoule:.1f} s — {len(latences) / ecoule:.0f} req/s")
+    print(f"Statuts : {dict(statuts)}")
+    if len(latences_ms):
+        p50, p90, p99 = np.percentile(latences_ms, [50, 90, 99])
+        print(f"Latence (ms) : p50={p50:.2f} p90={p90:.2f} p99={p99:.2f} max={latences_ms.max():.2f}")
+
+
+if __name__ == "__main__":
+    main()
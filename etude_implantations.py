@@ -0,0 +1,54 @@
+# etude_implantations.py
+# Étude d'implantation de sites radar : évaluation parallèle de nombreuses implantations candidates sur la grille ZEE
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from Dashboard import FICHIER_GEO, MILLE_NAUTIQUE_KM, charger_couches_geo, evaluer_implantations
+
+
+def sites_candidats(chemin, espacement_deg=0.05):
+    """Points candidats répartis le long du trait de côte"""
+    polygones, _ = charger_couches_geo(chemin)
+    candidats = []
+    for _, anneau in polygones['cote']:
+        for debut, fin in zip(anneau[:-1], anneau[1:]):
+            etapes = max(int(np.hypot(*(fin - debut)) / espacement_deg), 1)
+            candidats.append(debut + np.linspace(0, 1, etapes, endpoint=False)[:, None] * (fin - debut))
+    return np.vstack(candidats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Étude d'implantation de radars côtiers sur la ZEE du Sri Lanka")
+    parser.add_argument('--sites', type=int, default=6, help="Nombre de radars par implantation")
+    parser.add_argument('--implantations', type=int, default=5000)
+    parser.add_argument('--portee-nm', type=float, default=120.0)
+    parser.add_argument('--resolution-km', type=float, default=5.0)
+    parser.add_argument('--processus', type=int, default=None, help="Nombre de processus (défaut : tous les cœurs)")
+    parser.add_argument('--graine', type=int, default=0)
+    parser.add_argument('--meilleures', type=int, default=5)
+    args = parser.parse_args()
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    candidats = sites_candidats(FICHIER_GEO)
+    generateur = np.random.default_rng(args.graine)
+    choix = np.argsort(generateur.random((args.implantations, len(candidats))), axis=1)[:, :args.sites]
+    implantations = candidats[choix]
+
+    debut = time.perf_counter()
+    resultats = evaluer_implantations(implantations, [args.portee_nm * MILLE_NAUTIQUE_KM] * args.implantations,
+                                      resolution_km=args.resolution_km, processus=args.processus)
+    ecoule = time.perf_counter() - debut
+    print(f"Implantations : {args.implantations} en {ecoule:.1f} s — {args.implantations / ecoule * 60:.0f} par minute")
+
+    # Couverture maximale, puis chevauchement minimal
+    classement = resultats.sort_values(['couverture', 'chevauchement'], ascending=[False, True])
+    for rang, (indice, ligne) in enumerate(classement.head(args.meilleures).iterrows(), 1):
+        sites = ", ".join(f"({lon:.2f}, {lat:.2f})" for lon, lat in implantations[indice])
+        print(f"{rang}. couverture {ligne['couverture']:.1%} — chevauchement {ligne['chevauchement']:.1%} — {sites}")
+
+
+if __name__ == "__main__":
+    main()
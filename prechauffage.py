@@ -0,0 +1,107 @@
+# prechauffage.py
+# Préchauffage au démarrage : précalcul des combinaisons les plus utilisées, instantané persisté et fichier de disponibilité
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import Dashboard
+from rejeu_sessions import installer_surface
+
+
+@contextmanager
+def surface_prechauffage():
+    """Surface sans interface le temps du préchauffage ; Streamlit et le niveau de ses journaux restaurés ensuite"""
+    st_original, journal = Dashboard.st, logging.getLogger('streamlit')
+    niveau = journal.level
+    try:
+        yield installer_surface()
+    finally:
+        Dashboard.st = st_original
+        journal.setLevel(niveau)
+
+
+def controles_par_defaut():
+    """Contrôles d'une première visite (valeurs par défaut de tous les widgets du panneau latéral)"""
+    with surface_prechauffage() as surface:
+        surface.preparer_session({})
+        return Dashboard.DefenseSriLankaDashboardAvance().create_advanced_sidebar()
+
+
+def combinaisons_frequentes(chemins, nombre=8):
+    """Contrôles à précalculer : ceux par défaut, puis ceux des sélections les plus enregistrées
+    (le scénario ne change aucune donnée ni aucune clé de cache : une seule combinaison par sélection)"""
+    defaut = controles_par_defaut()
+    comptes, exemples = Counter(), {}
+    for session in Dashboard.charger_sessions([chemin for chemin in chemins if os.path.exists(chemin)]):
+        for interaction in session:
+            controls = interaction['controls']
+            comptes[controls['selection']] += 1
+            exemples[controls['selection']] = {**controls, 'source_observee': ""}
+    combinaisons = [defaut]
+    for selection, _ in comptes.most_common():
+        if len(combinaisons) >= nombre:
+            break
+        if selection != defaut['selection']:
+            combinaisons.append(exemples[selection])
+    return combinaisons
+
+
+def prechauffer(combinaisons):
+    """Exécute le dashboard complet (données, figures, simulations) pour chaque combinaison ; renvoie les durées"""
+    durees = []
+    with surface_prechauffage() as surface:
+        for controls in combinaisons:
+            surface.preparer_session({})
+            dashboard = Dashboard.DefenseSriLankaDashboardAvance()
+            dashboard.create_advanced_sidebar = lambda controls=controls: dict(controls)
+            debut = time.perf_counter()
+            dashboard.run_advanced_dashboard()
+            durees.append({'selection': controls['selection'], 'duree_s': round(time.perf_counter() - debut, 3)})
+    return durees
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Préchauffage du dashboard défense Sri Lanka avant la première session")
+    parser.add_argument('--enregistrements', nargs='*', default=[os.environ.get("SRI_LANKA_ENREGISTREMENT", "")],
+                        help="Sessions enregistrées servant au classement des combinaisons les plus utilisées")
+    parser.add_argument('--nombre', type=int, default=8, help="Nombre de sélections précalculées")
+    parser.add_argument('--instantane', default=Dashboard.FICHIER_INSTANTANE)
+    parser.add_argument('--pret', default=Dashboard.FICHIER_PRET, help="Fichier de disponibilité écrit en fin de préchauffage")
+    parser.add_argument('--serveur', nargs=argparse.REMAINDER,
+                        help="Lance ensuite Streamlit dans ce processus (modules déjà importés), options transmises")
+    args = parser.parse_args()
+
+    # Un fichier de disponibilité d'un démarrage précédent ne doit pas être pris pour celui-ci
+    if os.path.exists(args.pret):
+        os.remove(args.pret)
+    os.environ.pop("SRI_LANKA_ENREGISTREMENT", None)
+    # Le processus Streamlit éventuel relit l'instantané au même emplacement
+    os.environ["SRI_LANKA_INSTANTANE"] = Dashboard.FICHIER_INSTANTANE = args.instantane
+
+    debut = time.perf_counter()
+    durees = prechauffer(combinaisons_frequentes(args.enregistrements, args.nombre))
+    taille = Dashboard.sauvegarder_instantane(args.instantane)
+    etat = {'pret': True, 'version': Dashboard.version_code(), 'horodatage': time.time(),
+            'duree_s': round(time.perf_counter() - debut, 3), 'combinaisons': durees,
+            'instantane': args.instantane, 'taille_instantane': taille}
+    contenu = json.dumps(etat, ensure_ascii=False, indent=2).encode('utf-8')
+    Dashboard.ecrire_fichier_prive(args.pret, lambda fichier: fichier.write(contenu))
+    for duree in durees:
+        print(f"{duree['selection']} : {duree['duree_s']:.2f} s")
+    print(f"Préchauffage : {len(durees)} sélections en {etat['duree_s']:.1f} s — instantané {taille / 2**20:.1f} Mo")
+
+    if args.serveur is not None:
+        # Le serveur (et son point de santé) ne démarre qu'une fois le préchauffage terminé
+        from streamlit.web import cli
+        sys.argv = ["streamlit", "run", os.path.join(os.path.dirname(os.path.abspath(__file__)), "Dashboard.py"),
+                    *args.serveur]
+        cli.main()
+
+
+if __name__ == "__main__":
+    main()
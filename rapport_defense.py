@@ -0,0 +1,429 @@
+# rapport_defense.py
+# Rapport complet (HTML ou PDF autonome) écrit section par section en flux : mémoire bornée quelle que soit la taille
+import argparse
+import base64
+import html
+import io
+import logging
+import os
+import re
+import textwrap
+import time
+from collections import deque
+from html.parser import HTMLParser
+
+import matplotlib.image as mpimg
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from plotly.offline import get_plotlyjs
+
+import Dashboard
+from rejeu_sessions import SurfaceFactice
+
+# Pictogrammes hors des polices PDF standard (rendus comme des carrés vides)
+PICTOGRAMMES = re.compile('[\U0001F000-\U0001FFFF\uFE0F]')
+
+# Le scénario ne modifie aucune série : une seule section par sélection, au scénario de référence
+SCENARIO_REFERENCE = "Statut Quo"
+
+
+class ExtracteurTexte(HTMLParser):
+    """Texte brut d'un fragment HTML, un paragraphe par bloc (styles ignorés)"""
+
+    BLOCS = {'p', 'div', 'br', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'table'}
+
+    def __init__(self):
+        super().__init__()
+        self.lignes, self._courante, self._ignorer = [], [], 0
+
+    def handle_starttag(self, balise, attributs):
+        if balise in ('style', 'script'):
+            self._ignorer += 1
+        elif balise in self.BLOCS:
+            self._couper()
+
+    def handle_endtag(self, balise):
+        if balise in ('style', 'script'):
+            self._ignorer = max(self._ignorer - 1, 0)
+        elif balise in self.BLOCS:
+            self._couper()
+
+    def handle_data(self, donnees):
+        if not self._ignorer:
+            self._courante.append(donnees)
+
+    def _couper(self):
+        ligne = " ".join("".join(self._courante).split())
+        if ligne:
+            self.lignes.append(ligne)
+        self._courante = []
+
+    def extraire(self, fragment):
+        self.feed(fragment)
+        self.close()
+        self._couper()
+        return self.lignes
+
+
+def markdown_vers_html(texte):
+    """Markdown Streamlit minimal (titres, gras, italique, listes) hors HTML explicite"""
+    blocs = []
+    for ligne in textwrap.dedent(texte).strip().splitlines():
+        contenu = html.escape(ligne.strip())
+        contenu = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', contenu)
+        contenu = re.sub(r'\*(.+?)\*', r'<em>\1</em>', contenu)
+        titre = re.match(r'(#{1,6})\s+(.*)', contenu)
+        if titre:
+            blocs.append(f"<h{len(titre.group(1))}>{titre.group(2)}</h{len(titre.group(1))}>")
+        elif re.match(r'[-*]\s+', contenu):
+            blocs.append(f"<li>{contenu[2:]}</li>")
+        elif contenu:
+            blocs.append(f"<p>{contenu}</p>")
+    return "\n".join(blocs)
+
+
+# --- Écrivains ------------------------------------------------------------
+
+class EcrivainHTML:
+    """Document HTML autonome écrit au fil de l'eau ; plotly.js inclus une seule fois, au premier graphique interactif"""
+
+    def __init__(self, chemin, images_statiques=False):
+        self.images_statiques = images_statiques
+        self.fichier = open(chemin, 'w', encoding='utf-8')
+        self._plotlyjs_inclus = False
+        self.fichier.write('<!DOCTYPE html>\n<html lang="fr">\n<head>\n<meta charset="utf-8">\n'
+                           '<title>Analyse stratégique avancée - Sri Lanka</title>\n'
+                           f'{Dashboard.CSS_PERSONNALISE}\n'
+                           '<style>body{font-family:sans-serif;margin:2rem auto;max-width:1200px}'
+                           '.kpi{display:inline-block;border:1px solid #ddd;border-radius:8px;padding:.6rem 1rem;margin:.3rem}'
+                           '.kpi span{display:block;font-size:.8rem;color:#666}.kpi b{font-size:1.4rem}'
+                           '.encadre{border-left:4px solid #FFB400;background:#fff8e6;padding:.5rem 1rem;margin:.5rem 0}'
+                           'table{border-collapse:collapse;font-size:.8rem}td,th{border:1px solid #ddd;padding:2px 6px}'
+                           'figure{margin:1rem 0}</style>\n</head>\n<body>\n')
+
+    def titre(self, texte, niveau):
+        self.fichier.write(f"<h{niveau}>{html.escape(texte)}</h{niveau}>\n")
+
+    def markdown(self, texte, html_brut):
+        self.fichier.write((texte if html_brut else markdown_vers_html(texte)) + "\n")
+
+    def encadre(self, texte):
+        self.fichier.write(f'<div class="encadre">{markdown_vers_html(texte)}</div>\n')
+
+    def indicateur(self, libelle, valeur, variation):
+        variation = f"<span>{html.escape(str(variation))}</span>" if variation is not None else ""
+        self.fichier.write(f'<div class="kpi"><span>{html.escape(str(libelle))}</span>'
+                           f'<b>{html.escape(str(valeur))}</b>{variation}</div>\n')
+
+    def tableau(self, df):
+        self.fichier.write(df.to_html(border=0, na_rep="", float_format=lambda v: f"{v:,.2f}") + "\n")
+
+    def figure(self, fig, image):
+        if image is not None:
+            self.fichier.write('<figure><img style="width:100%" src="data:image/png;base64,'
+                               f'{base64.b64encode(image).decode("ascii")}"></figure>\n')
+            return
+        if not self._plotlyjs_inclus:
+            self.fichier.write(f'<script type="text/javascript">{get_plotlyjs()}</script>\n')
+            self._plotlyjs_inclus = True
+        self.fichier.write("<figure>" + pio.to_html(fig, include_plotlyjs=False, full_html=False,
+                                                    config={'displayModeBar': False}) + "</figure>\n")
+
+    def fermer(self):
+        self.fichier.write("</body>\n</html>\n")
+        self.fichier.close()
+
+
+class EcrivainPDF:
+    """Document PDF écrit page par page (A4) : chaque page pleine est émise puis libérée"""
+
+    FORMAT_A4 = (8.27, 11.69)
+    MARGE = 0.05
+    INTERLIGNE = 0.016
+    CARACTERES_PAR_LIGNE = 100
+
+    def __init__(self, chemin, images_statiques=True):
+        self.images_statiques = images_statiques
+        self.pages = PdfPages(chemin)
+        self.page, self.curseur = None, 0.0
+
+    def _emettre(self):
+        if self.page is not None:
+            self.pages.savefig(self.page)
+            self.page = None
+
+    def _reserver(self, hauteur):
+        """Ordonnée haute d'un bloc de hauteur donnée (fraction de page), sur une nouvelle page si nécessaire"""
+        if self.page is None or self.curseur - hauteur < self.MARGE:
+            self._emettre()
+            self.page = Figure(figsize=self.FORMAT_A4)
+            self.curseur = 1 - self.MARGE
+        haut = self.curseur
+        self.curseur -= hauteur
+        return haut
+
+    def _lignes(self, lignes, taille=8, police='sans-serif', gras=False):
+        for ligne in lignes:
+            ligne = PICTOGRAMMES.sub('', ligne).strip()
+            for morceau in textwrap.wrap(ligne, self.CARACTERES_PAR_LIGNE) or [""]:
+                y = self._reserver(self.INTERLIGNE * taille / 8)
+                self.page.text(self.MARGE, y, morceau, fontsize=taille, family=police,
+                               weight='bold' if gras else 'normal', va='top')
+
+    def titre(self, texte, niveau):
+        if niveau == 1:
+            self._emettre()
+        self.curseur -= self.INTERLIGNE if self.page is not None else 0
+        self._lignes([texte], taille={1: 16, 2: 13}.get(niveau, 11), gras=True)
+
+    def markdown(self, texte, html_brut):
+        self._lignes(ExtracteurTexte().extraire(texte if html_brut else markdown_vers_html(texte)))
+
+    def encadre(self, texte):
+        self._lignes(["▌ " + ligne for ligne in ExtracteurTexte().extraire(markdown_vers_html(texte))])
+
+    def indicateur(self, libelle, valeur, variation):
+        self._lignes([f"{libelle} : {valeur}" + (f" ({variation})" if variation is not None else "")], gras=True)
+
+    def tableau(self, df):
+        # Tableau en police à chasse fixe, découpé sur autant de pages que nécessaire
+        lignes = df.to_string(max_colwidth=30, float_format=lambda v: f"{v:,.2f}").splitlines()
+        for ligne in lignes:
+            y = self._reserver(self.INTERLIGNE * 0.8)
+            self.page.text(self.MARGE, y, ligne[:150], fontsize=5.5, family='monospace', va='top')
+
+    def figure(self, fig, image):
+        hauteur = 0.36
+        haut = self._reserver(hauteur)
+        cadre = [self.MARGE, haut - hauteur + 0.02, 1 - 2 * self.MARGE, hauteur - 0.03]
+        if image is not None:
+            axe = self.page.add_axes(cadre)
+            axe.imshow(mpimg.imread(io.BytesIO(image), format='png'))
+            axe.set_axis_off()
+        else:
+            tracer_matplotlib(self.page, cadre, fig)
+
+    def fermer(self):
+        self._emettre()
+        self.pages.close()
+
+
+def tracer_matplotlib(page, cadre, fig):
+    """Repli sans kaleido : traces cartésiennes (lignes, nuages, barres, cartes de chaleur) redessinées par matplotlib"""
+    axes_plotly = list(dict.fromkeys((trace.xaxis or 'x') if 'xaxis' in trace else 'x' for trace in fig.data)) or ['x']
+    gauche, bas, largeur, hauteur = cadre
+    pas = largeur / len(axes_plotly)
+    empiler = fig.layout.barmode in ('stack', 'relative')
+    bases = {}
+    axes = {nom: page.add_axes([gauche + i * pas + 0.04, bas + 0.02, pas - 0.06, hauteur - 0.06])
+            for i, nom in enumerate(axes_plotly)}
+    for trace in fig.data:
+        axe = axes[(trace.xaxis or 'x') if 'xaxis' in trace else 'x']
+        nom = getattr(trace, 'name', None) or None
+        try:
+            if trace.type in ('scatter', 'scattergl'):
+                if 'lines' in (trace.mode or 'lines'):
+                    axe.plot(trace.x, trace.y, label=nom, linewidth=1)
+                else:
+                    axe.scatter(trace.x, trace.y, label=nom, s=6)
+            elif trace.type == 'bar':
+                horizontale = trace.orientation == 'h'
+                categories, valeurs = (trace.y, trace.x) if horizontale else (trace.x, trace.y)
+                base = bases.get(id(axe), 0)
+                if horizontale:
+                    axe.barh(categories, valeurs, left=base, label=nom)
+                else:
+                    axe.bar(categories, valeurs, bottom=base, label=nom)
+                if empiler:
+                    bases[id(axe)] = base + np.asarray(valeurs, dtype=float)
+            elif trace.type == 'heatmap':
+                axe.imshow(np.asarray(trace.z, dtype=float), aspect='auto', cmap='RdYlGn_r')
+                if trace.x is not None:
+                    axe.set_xticks(range(len(trace.x)), [str(v) for v in trace.x], rotation=45, fontsize=5)
+                if trace.y is not None:
+                    axe.set_yticks(range(len(trace.y)), [str(v) for v in trace.y], fontsize=5)
+        except (TypeError, ValueError):
+            continue
+    titre = fig.layout.title.text or ""
+    page.text(gauche, bas + hauteur, PICTOGRAMMES.sub('', re.sub(r'<[^>]+>', '', titre)).strip(), fontsize=8, weight='bold', va='bottom')
+    for axe in axes.values():
+        axe.tick_params(labelsize=5)
+        if len(axe.get_legend_handles_labels()[1]) > 1:
+            axe.legend(fontsize=4, loc='best')
+
+
+# --- Capture des sections ---------------------------------------------------
+
+class FluxRapport:
+    """File ordonnée des éléments du rapport : les images sont rendues en parallèle dans une fenêtre bornée,
+    puis écrites dans l'ordre du document dès que l'élément le plus ancien est prêt"""
+
+    def __init__(self, ecrivain, fenetre=16):
+        self.ecrivain = ecrivain
+        self.fenetre = fenetre
+        self.file = deque()
+        self.erreurs_rendu = set()
+        self.figures = 0
+
+    def ajouter(self, methode, *args):
+        self.file.append((methode, args, None))
+        self._limiter()
+
+    def ajouter_figure(self, fig):
+        futur = Dashboard.exporter_figure(fig) if self.ecrivain.images_statiques else None
+        self.file.append(('figure', (fig,), futur))
+        self.figures += 1
+        self._limiter()
+
+    def _limiter(self):
+        # Au-delà de la fenêtre, on attend l'élément le plus ancien : au plus `fenetre` figures en mémoire
+        while sum(futur is not None for _, _, futur in self.file) > self.fenetre or \
+                len(self.file) > 4 * self.fenetre:
+            self._ecrire_premier()
+
+    def _ecrire_premier(self):
+        methode, args, futur = self.file.popleft()
+        if methode == 'figure':
+            image = None
+            if futur is not None:
+                try:
+                    image = futur.result(timeout=120)
+                except Exception as erreur:
+                    self.erreurs_rendu.add(str(erreur))
+            self.ecrivain.figure(args[0], image)
+        else:
+            getattr(self.ecrivain, methode)(*args)
+
+    def vider(self):
+        while self.file:
+            self._ecrire_premier()
+
+
+class OngletRapport:
+    """Onglet Streamlit capturé : son libellé devient un titre de section à l'entrée du bloc `with`"""
+
+    def __init__(self, surface, libelle):
+        self.surface, self.libelle = surface, libelle
+
+    def __enter__(self):
+        self.surface.flux.ajouter('titre', self.libelle, 2)
+        return self.surface
+
+    def __exit__(self, *exc):
+        return False
+
+
+class SurfaceRapport(SurfaceFactice):
+    """Surface Streamlit de capture : les éléments affichés alimentent le flux du rapport, le panneau latéral est ignoré"""
+
+    def __init__(self, flux):
+        super().__init__()
+        self.flux = flux
+        self.sidebar = SurfaceFactice()
+
+    def tabs(self, onglets):
+        return [OngletRapport(self, libelle) for libelle in onglets]
+
+    def markdown(self, texte, unsafe_allow_html=False, **kwargs):
+        self.flux.ajouter('markdown', texte, unsafe_allow_html)
+
+    def write(self, *objets, **kwargs):
+        for objet in objets:
+            if isinstance(objet, pd.DataFrame):
+                self.flux.ajouter('tableau', objet.copy())
+            else:
+                self.flux.ajouter('markdown', str(objet), False)
+
+    def title(self, texte, **kwargs):
+        self.flux.ajouter('titre', texte, 2)
+
+    def header(self, texte, **kwargs):
+        self.flux.ajouter('titre', texte, 3)
+
+    def subheader(self, texte, **kwargs):
+        self.flux.ajouter('titre', texte, 4)
+
+    def caption(self, texte, **kwargs):
+        self.flux.ajouter('markdown', f"*{texte}*", False)
+
+    def info(self, texte, **kwargs):
+        self.flux.ajouter('encadre', str(texte))
+
+    warning = success = error = info
+
+    def metric(self, label, value, delta=None, **kwargs):
+        self.flux.ajouter('indicateur', label, value, delta)
+
+    def dataframe(self, data, **kwargs):
+        donnees = data.data if hasattr(data, 'data') and not isinstance(data, pd.DataFrame) else data
+        self.flux.ajouter('tableau', pd.DataFrame(donnees).copy())
+
+    table = dataframe
+
+    def plotly_chart(self, fig, **kwargs):
+        self.flux.ajouter_figure(fig)
+
+
+def generer_rapport(chemin, selections, images_statiques, fenetre=16):
+    """Écrit le rapport de toutes les sélections ; renvoie (sections, figures, erreurs)"""
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    if chemin.lower().endswith('.pdf'):
+        ecrivain = EcrivainPDF(chemin, images_statiques)
+    else:
+        ecrivain = EcrivainHTML(chemin, images_statiques)
+    flux = FluxRapport(ecrivain, fenetre)
+    surface = SurfaceRapport(flux)
+    st_original, Dashboard.st = Dashboard.st, surface
+    sections = 0
+    try:
+        for selection in selections:
+            surface.preparer_session({})
+            dashboard = Dashboard.DefenseSriLankaDashboardAvance()
+            type_analyse = ("Programmes Stratégiques" if selection in dashboard.programmes_options
+                            else "Analyse Branche Militaire")
+            controls = {'selection': selection, 'type_analyse': type_analyse, 'show_geopolitical': True,
+                        'show_doctrinal': True, 'show_technical': True, 'threat_assessment': True,
+                        'mode_rapport': False, 'scenario': SCENARIO_REFERENCE, 'source_observee': ""}
+            dashboard.create_advanced_sidebar = lambda controls=controls: dict(controls)
+            flux.ajouter('titre', f"{selection} — scénario {SCENARIO_REFERENCE}", 1)
+            dashboard.run_advanced_dashboard()
+            sections += 1
+        flux.vider()
+    finally:
+        Dashboard.st = st_original
+        ecrivain.fermer()
+    return sections, flux.figures, flux.erreurs_rendu
+
+
+def main():
+    # Génération sans enregistrement de session
+    os.environ.pop("SRI_LANKA_ENREGISTREMENT", None)
+    dashboard = Dashboard.DefenseSriLankaDashboardAvance()
+    disponibles = dashboard.branches_options + dashboard.programmes_options
+
+    parser = argparse.ArgumentParser(description="Rapport complet du dashboard défense Sri Lanka (HTML ou PDF)")
+    parser.add_argument('sortie', help="Fichier de sortie (.html ou .pdf)")
+    parser.add_argument('--selections', nargs='*', choices=disponibles, metavar='SELECTION',
+                        help="Sélections (défaut : toutes les branches et programmes)")
+    parser.add_argument('--images', choices=['statiques', 'interactives'], default=None,
+                        help="Figures en images (kaleido) ou interactives ; défaut : statiques en PDF, interactives en HTML")
+    parser.add_argument('--fenetre', type=int, default=2 * (os.cpu_count() or 2),
+                        help="Nombre maximal d'images en cours de rendu")
+    args = parser.parse_args()
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    selections = args.selections or disponibles
+    images = args.images or ('statiques' if args.sortie.lower().endswith('.pdf') else 'interactives')
+
+    debut = time.perf_counter()
+    sections, figures, erreurs = generer_rapport(args.sortie, selections, images == 'statiques', args.fenetre)
+    print(f"Rapport : {args.sortie} — {sections} sélections, {figures} figures, "
+          f"{os.path.getsize(args.sortie) / 2**20:.1f} Mo en {time.perf_counter() - debut:.1f} s")
+    for erreur in erreurs:
+        print(f"Rendu statique indisponible (repli) : {erreur}")
+
+
+if __name__ == "__main__":
+    main()
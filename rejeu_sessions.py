@@ -0,0 +1,144 @@
+# rejeu_sessions.py
+# Rejeu sans interface des sessions enregistrées (SRI_LANKA_ENREGISTREMENT) : débit et percentiles de latence
+import argparse
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+import Dashboard
+
+
+class SurfaceFactice:
+    """Surface de rendu Streamlit factice : accepte tout appel, renvoie les valeurs par défaut des widgets"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self.sidebar = self
+
+    # Chaque fil de rejeu a son propre état de session et ses valeurs de widgets enregistrées
+    @property
+    def session_state(self):
+        if not hasattr(self._local, 'etat'):
+            self._local.etat = {}
+        return self._local.etat
+
+    def preparer_session(self, widgets):
+        self._local.etat = {}
+        self._local.widgets = dict(widgets)
+
+    def _widget(self, cle, defaut):
+        return getattr(self._local, 'widgets', {}).get(cle, defaut)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __getattr__(self, nom):
+        # Tout élément d'affichage (markdown, metric, plotly_chart, image, warning...) est un puits
+        return self
+
+    def __iter__(self):
+        return iter(())
+
+    def columns(self, spec, **kwargs):
+        return [self] * (spec if isinstance(spec, int) else len(spec))
+
+    def tabs(self, onglets):
+        return [self] * len(onglets)
+
+    def selectbox(self, label, options, index=0, key=None, **kwargs):
+        # Comme Streamlit, une valeur enregistrée absente des options (autre sélection) revient au défaut
+        options = list(options)
+        valeur = self._widget(key, options[index])
+        return valeur if valeur in options else options[index]
+
+    def radio(self, label, options, index=0, key=None, **kwargs):
+        return self.selectbox(label, options, index, key)
+
+    def slider(self, label, min_value=None, max_value=None, value=None, step=None, key=None, **kwargs):
+        return self._widget(key, min_value if value is None else value)
+
+    def checkbox(self, label, value=False, key=None, **kwargs):
+        return self._widget(key, value)
+
+    def text_input(self, label, value="", key=None, **kwargs):
+        return self._widget(key, value)
+
+
+def installer_surface():
+    # Pas d'avertissements du mode Streamlit « bare » dans les fils et processus de rejeu
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    surface = SurfaceFactice()
+    Dashboard.st = surface
+    return surface
+
+
+def rejouer_session(session, acceleration=0.0):
+    """Rejoue une session dans l'ordre enregistré ; renvoie la latence de chaque réexécution"""
+    surface = Dashboard.st if isinstance(Dashboard.st, SurfaceFactice) else installer_surface()
+    surface.preparer_session({})
+    latences = []
+    for i, interaction in enumerate(session):
+        if acceleration and i:
+            # Respect des délais de réflexion de l'utilisateur, accélérés
+            time.sleep(max(interaction['horodatage'] - session[i - 1]['horodatage'], 0.0) / acceleration)
+        surface._local.widgets = interaction.get('widgets', {})
+        dashboard = Dashboard.DefenseSriLankaDashboardAvance()
+        dashboard.create_advanced_sidebar = lambda controls=interaction['controls']: dict(controls)
+        debut = time.perf_counter()
+        dashboard.run_advanced_dashboard()
+        latences.append(time.perf_counter() - debut)
+    return latences
+
+
+def _rejouer_lot(sessions, acceleration):
+    return [rejouer_session(session, acceleration) for session in sessions]
+
+
+def executer(sessions, concurrence, mode, acceleration, repetitions):
+    sessions = sessions * repetitions
+    debut = time.perf_counter()
+    if mode == 'processus':
+        lots = [sessions[i::concurrence] for i in range(concurrence)]
+        with ProcessPoolExecutor(max_workers=concurrence, initializer=installer_surface) as pool:
+            resultats = [latence for lot in pool.map(_rejouer_lot, lots, [acceleration] * len(lots)) for latence in lot]
+    else:
+        installer_surface()
+        with ThreadPoolExecutor(max_workers=concurrence) as pool:
+            resultats = list(pool.map(rejouer_session, sessions, [acceleration] * len(sessions)))
+    return resultats, time.perf_counter() - debut
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejeu de sessions enregistrées du dashboard défense Sri Lanka")
+    parser.add_argument('chemins', nargs='+', help="Fichiers .jsonl ou répertoires d'enregistrement")
+    parser.add_argument('--concurrence', type=int, default=4)
+    parser.add_argument('--mode', choices=['fils', 'processus'], default='processus')
+    parser.add_argument('--acceleration', type=float, default=0.0,
+                        help="Respecte les délais enregistrés divisés par ce facteur (0 : sans délai)")
+    parser.add_argument('--repetitions', type=int, default=1)
+    args = parser.parse_args()
+
+    # Rejeu sans réenregistrement
+    os.environ.pop("SRI_LANKA_ENREGISTREMENT", None)
+    sessions = Dashboard.charger_sessions(args.chemins)
+    resultats, ecoule = executer(sessions, args.concurrence, args.mode, args.acceleration, args.repetitions)
+    latences_ms = np.array([latence for session in resultats for latence in session]) * 1000
+    print(f"Sessions : {len(resultats)} — réexécutions : {len(latences_ms)} en {ecoule:.1f} s "
+          f"({len(latences_ms) / ecoule:.1f} réexécutions/s)")
+    if len(latences_ms):
+        p50, p90, p99 = np.percentile(latences_ms, [50, 90, 99])
+        print(f"Latence (ms) : p50={p50:.1f} p90={p90:.1f} p99={p99:.1f} max={latences_ms.max():.1f}")
+
+
+if __name__ == "__main__":
+    main()
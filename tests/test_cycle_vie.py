@@ -0,0 +1,95 @@
+# test_cycle_vie.py
+# Équivalence de la simulation vectorisée du cycle de vie avec un calendrier mensuel par actif calculé en force brute
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Dashboard import simulateur_depuis_registre
+
+REGISTRE = {
+    "Frégate A": {"type": "Frégate", "annee": 1985, "unites": 2, "derniere_livraison": 1990},
+    "Patrouilleur B": {"type": "Patrouilleur", "annee": 2001, "unites": 5, "derniere_livraison": 2012},
+    "Vedette C": {"type": "Vedette", "annee": 1998, "unites": 12, "derniere_livraison": 2020},
+    "Transport D": {"type": "Transport", "annee": 2015},
+}
+DEBUT, FIN = 1995, 2040
+
+
+def milieux_des_pas(simulateur):
+    return simulateur.debut + (np.arange(simulateur.nombre_pas) + 0.5) / simulateur.pas_par_an
+
+
+def calendrier(simulateur, mise, retrait, arrets):
+    """Actifs en service et disponibles par groupe et par pas, actif par actif et pas par pas"""
+    milieux = milieux_des_pas(simulateur)
+    en_service = np.zeros((simulateur.nombre_groupes, simulateur.nombre_pas))
+    disponibles = np.zeros_like(en_service)
+    for actif, groupe in enumerate(simulateur.groupes):
+        for pas, temps in enumerate(milieux):
+            if not mise[actif] <= temps < retrait[actif]:
+                continue
+            en_service[groupe, pas] += 1
+            if not any(debut <= temps < fin for debut, fin in arrets[actif]):
+                disponibles[groupe, pas] += 1
+    return en_service, disponibles
+
+
+def arrets_nominaux(simulateur):
+    """Calendrier nominal (sans pannes) réécrit indépendamment : maintenance périodique, refonte à mi-vie"""
+    p = simulateur.parametres
+    retraits, arrets = [], []
+    for actif, mise in enumerate(simulateur.mise_en_service):
+        retrait = mise + p['duree_vie'][actif]
+        maintenance, refonte, liste = mise + p['cycle_maintenance'][actif], mise + p['duree_vie'][actif] / 2, []
+        while min(maintenance, refonte) < retrait:
+            debut = min(maintenance, refonte)
+            duree = p['refonte'][actif] if refonte <= maintenance else p['duree_maintenance'][actif]
+            liste.append((debut, min(debut + duree, retrait)))
+            if refonte <= maintenance:
+                refonte = np.inf
+            maintenance = debut + duree + p['cycle_maintenance'][actif]
+        retraits.append(retrait)
+        arrets.append(liste)
+    return np.array(retraits), arrets
+
+
+def test_calendrier_nominal_identique_a_la_force_brute():
+    simulateur = simulateur_depuis_registre(REGISTRE, DEBUT, FIN)
+    resultats = simulateur.simuler(executions=1, aleatoire=False)
+    retraits, arrets = arrets_nominaux(simulateur)
+    en_service, disponibles = calendrier(simulateur, simulateur.mise_en_service, retraits, arrets)
+    np.testing.assert_array_equal(resultats['en_service'][0], en_service)
+    np.testing.assert_array_equal(resultats['disponibles'][0], disponibles)
+
+
+def test_executions_aleatoires_identiques_au_calendrier_des_evenements():
+    simulateur = simulateur_depuis_registre(REGISTRE, DEBUT, FIN)
+    executions, graine = 4, 7
+    resultats = simulateur.simuler(executions, graine, executions_par_bloc=executions)
+
+    # Mêmes tirages que l'unique bloc de la simulation, événements replacés un à un dans le calendrier
+    generateur = np.random.default_rng(np.random.SeedSequence(graine).spawn(1)[0])
+    lot = np.arange(len(simulateur.mise_en_service))
+    retrait = simulateur._retraits(generateur, executions, lot, True)
+    arrets = [[] for _ in range(retrait.size)]
+    for indices, debuts, fins, _ in simulateur._arrets(generateur, lot, retrait, True):
+        for indice, debut, fin in zip(indices, debuts, fins):
+            arrets[indice].append((debut, fin))
+    for execution in range(executions):
+        colonnes = slice(execution * len(lot), (execution + 1) * len(lot))
+        en_service, disponibles = calendrier(simulateur, simulateur.mise_en_service, retrait[execution],
+                                             arrets[colonnes])
+        np.testing.assert_array_equal(resultats['en_service'][execution], en_service)
+        np.testing.assert_array_equal(resultats['disponibles'][execution], disponibles)
+
+
+def test_resultat_independant_du_nombre_de_processus():
+    simulateur = simulateur_depuis_registre(REGISTRE, DEBUT, FIN)
+    sequentiel = simulateur.simuler(executions=8, graine=3, processus=1, executions_par_bloc=2)
+    parallele = simulateur.simuler(executions=8, graine=3, processus=2, executions_par_bloc=2)
+    for cle in sequentiel:
+        np.testing.assert_array_equal(sequentiel[cle], parallele[cle])
+